@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Benchmark - latency, throughput and memory of search and
+design-system generation over a fixed query corpus.
+
+Every CSV_CONFIG domain and STACK_CONFIG stack is exercised. Each scenario
+reports latency percentiles (ms), queries per second and, at the end, peak
+RSS. Results can be written as JSON and compared against an earlier run.
+
+Scenarios:
+    cold   in-memory indexes and query cache dropped before every call
+           (measures loading the on-disk index)
+    index  indexes warm, query cache dropped (measures BM25 scoring)
+    warm   everything cached (steady state of a resident process)
+
+Startup benchmarks run search.py as a fresh interpreter per call (no daemon,
+on-disk index already built):
+    process  wall time of the whole command
+    imports  sum of module import times reported by `python -X importtime`
+
+Usage:
+    python benchmark.py                          # human-readable summary
+    python benchmark.py --output bench.json      # also save machine-readable JSON
+    python benchmark.py --compare bench.json     # show ratios against a previous run
+    python benchmark.py --skip-startup           # in-process benchmarks only
+"""
+
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import core
+from core import CSV_CONFIG, STACK_CONFIG, FEDERATED_DOMAIN, search, search_stack, clear_index_cache, clear_search_cache
+from design_system import DesignSystemGenerator, format_master_md, persist_design_system
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# ============ FIXED QUERY CORPUS ============
+# Keep these stable: changing them invalidates comparisons between versions
+DOMAIN_QUERIES = {
+    "style": ["glassmorphism dark", "minimalism clean", "brutalism bold", "neumorphism soft ui", "aurora gradient"],
+    "prompt": ["tailwind css variables", "glassmorphism implementation", "dark mode checklist", "minimal prompt keywords"],
+    "color": ["saas dashboard palette", "healthcare calm", "fintech trust blue", "luxury ecommerce", "gaming neon"],
+    "chart": ["real-time dashboard trend", "comparison bar", "funnel conversion", "geographic heatmap"],
+    "landing": ["hero social-proof", "pricing conversion", "testimonial cta", "product launch waitlist"],
+    "product": ["SaaS dashboard", "healthcare app", "e-commerce luxury", "fintech crypto", "education platform"],
+    "ux": ["animation accessibility", "touch target mobile", "keyboard navigation focus", "scroll performance"],
+    "typography": ["elegant luxury serif", "modern sans clean", "playful rounded", "technical monospace"],
+    "icons": ["navigation menu", "social media", "settings gear", "arrow chevron"],
+    "react": ["suspense waterfall", "memo rerender", "bundle barrel imports", "server component"],
+    "web": ["aria focus outline", "form autocomplete", "semantic headings", "virtualize long list"],
+}
+
+# Every CSV_CONFIG domain is benchmarked: fail loudly when one is added without queries
+_uncovered = set(CSV_CONFIG) ^ set(DOMAIN_QUERIES)
+if _uncovered:
+    raise RuntimeError(f"DOMAIN_QUERIES must match CSV_CONFIG exactly; mismatched domains: {sorted(_uncovered)}")
+
+STACK_QUERIES = ["form validation", "responsive layout", "image optimization", "state management", "accessibility"]
+
+DESIGN_QUERIES = ["SaaS dashboard", "healthcare app", "beauty spa wellness service", "fintech crypto", "e-commerce luxury"]
+
+STARTUP_COMMANDS = {
+    "startup.search": ["glassmorphism dark", "--domain", "style"],
+    "startup.search_stack": ["responsive layout", "--stack", "html-tailwind"],
+    "startup.design_system": ["SaaS dashboard", "--design-system"],
+}
+
+SEARCH_SCRIPT = Path(__file__).parent / "search.py"
+
+
+# ============ MEASUREMENT ============
+def _percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def _summarize(samples: list) -> dict:
+    """Latency percentiles in ms and throughput for a list of durations in seconds."""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    ms = lambda s: round(s * 1000, 4)
+    return {
+        "n": len(ordered),
+        "mean_ms": ms(total / len(ordered)) if ordered else 0.0,
+        "p50_ms": ms(_percentile(ordered, 50)),
+        "p90_ms": ms(_percentile(ordered, 90)),
+        "p99_ms": ms(_percentile(ordered, 99)),
+        "max_ms": ms(ordered[-1]) if ordered else 0.0,
+        "qps": round(len(ordered) / total, 1) if total else 0.0,
+    }
+
+
+def _measure(calls: list, repeat: int, before=None) -> dict:
+    """Time every call `repeat` times, running `before` (untimed) ahead of each one."""
+    samples = []
+    for _ in range(repeat):
+        for call in calls:
+            if before:
+                before()
+            start = time.perf_counter()
+            call()
+            samples.append(time.perf_counter() - start)
+    return _summarize(samples)
+
+
+def _drop_all_caches():
+    clear_index_cache()
+    clear_search_cache()
+
+
+def _scenarios(calls: list, repeat: int) -> dict:
+    """cold / index / warm measurements for one set of calls."""
+    cold = _measure(calls, repeat, before=_drop_all_caches)
+    for call in calls:  # make sure every index is resident
+        call()
+    return {
+        "cold": cold,
+        "index": _measure(calls, repeat, before=clear_search_cache),
+        "warm": _measure(calls, repeat),
+    }
+
+
+def _import_times(stderr: str) -> dict:
+    """Parse `-X importtime` output into {module: (self_us, cumulative_us, depth)}."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def _startup(args: list, repeat: int) -> tuple:
+    """Time search.py in a fresh interpreter; returns (scenarios, heaviest top-level imports in ms)."""
+    command = [sys.executable, str(SEARCH_SCRIPT)] + args + ["--no-daemon"]
+    wall, imports, modules = [], [], {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        wall.append(time.perf_counter() - start)
+        # Separate run: -X importtime slows the interpreter down a little
+        traced = subprocess.run(command[:1] + ["-X", "importtime"] + command[1:], stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE, text=True, check=True)
+        modules = _import_times(traced.stderr)
+        imports.append(sum(self_us for self_us, _, _ in modules.values()) / 1e6)
+    top = sorted(((name, cumulative) for name, (_, cumulative, depth) in modules.items() if depth == 0),
+                 key=lambda item: -item[1])[:5]
+    return {"process": _summarize(wall), "imports": _summarize(imports)}, {name: round(us / 1000, 3) for name, us in top}
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS reports bytes
+
+
+# ============ BENCHMARKS ============
+def run(repeat: int = 5, startup: bool = True) -> dict:
+    """Run every benchmark and return the machine-readable report."""
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "index_version": core.INDEX_VERSION,
+            "repeat": repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "benchmarks": {},
+    }
+    bench = report["benchmarks"]
+
+    core.build_indexes()  # on-disk indexes exist, so "cold" measures loading, not building
+
+    if startup:
+        report["startup_imports_ms"] = {}
+        for name, args in STARTUP_COMMANDS.items():
+            bench[name], report["startup_imports_ms"][name] = _startup(args, repeat)
+
+    for domain, queries in DOMAIN_QUERIES.items():
+        calls = [lambda q=q, d=domain: search(q, d) for q in queries]
+        bench[f"search.{domain}"] = _scenarios(calls, repeat)
+
+    calls = [lambda q=q: search(q, FEDERATED_DOMAIN) for queries in DOMAIN_QUERIES.values() for q in queries[:1]]
+    bench["search.all"] = _scenarios(calls, repeat)
+
+    for stack in STACK_CONFIG:
+        calls = [lambda q=q, s=stack: search_stack(q, s) for q in STACK_QUERIES]
+        bench[f"search_stack.{stack}"] = _scenarios(calls, repeat)
+
+    generator = DesignSystemGenerator()
+    calls = [lambda q=q: generator.generate(q) for q in DESIGN_QUERIES]
+    bench["design_system.generate"] = _scenarios(calls, repeat)
+
+    systems = [generator.generate(q) for q in DESIGN_QUERIES]
+    bench["design_system.format_master_md"] = {
+        "warm": _measure([lambda d=d: format_master_md(d) for d in systems], repeat)
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        calls = [lambda d=d, q=q: persist_design_system(d, "dashboard", tmp, q) for d, q in zip(systems, DESIGN_QUERIES)]
+        bench["design_system.persist"] = {"warm": _measure(calls, repeat)}
+
+    report["peak_rss_kb"] = peak_rss_kb()
+    return report
+
+
+# ============ REPORTING ============
+def format_report(report: dict, baseline: dict = None) -> str:
+    """Human-readable table; with a baseline, adds the p50 ratio (new / old)."""
+    lines = [f"{'benchmark':<40}{'scenario':<8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'qps':>12}"
+             + (f"{'p50 x':>9}" if baseline else "")]
+    old = (baseline or {}).get("benchmarks", {})
+    for name, scenarios in report["benchmarks"].items():
+        for scenario, stats in scenarios.items():
+            line = (f"{name:<40}{scenario:<8}{stats['p50_ms']:>10.3f}{stats['p90_ms']:>10.3f}"
+                    f"{stats['p99_ms']:>10.3f}{stats['qps']:>12.1f}")
+            before = old.get(name, {}).get(scenario)
+            if baseline:
+                ratio = stats["p50_ms"] / before["p50_ms"] if before and before["p50_ms"] else None
+                line += f"{ratio:>9.2f}" if ratio is not None else f"{'-':>9}"
+            lines.append(line)
+    for name, modules in report.get("startup_imports_ms", {}).items():
+        lines.append(f"{name} heaviest imports: " + ", ".join(f"{m} {ms:.1f} ms" for m, ms in modules.items()))
+    lines.append(f"peak RSS: {report['peak_rss_kb']} KiB" if report.get("peak_rss_kb") else "peak RSS: n/a")
+    return "\n".join(lines)
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark UI Pro Max search and design-system generation")
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="Passes over the query corpus per scenario (default: 5)")
+    parser.add_argument("--output", "-o", type=str, default=None, help="Write the JSON report to this file")
+    parser.add_argument("--compare", "-c", type=str, default=None, help="Previous JSON report to compare p50 latency against")
+    parser.add_argument("--json", action="store_true", help="Print the JSON report instead of the table")
+    parser.add_argument("--skip-startup", action="store_true", help="Skip the fresh-interpreter search.py startup benchmarks")
+
+    args = parser.parse_args()
+
+    result = run(args.repeat, startup=not args.skip_startup)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        baseline_report = None
+        if args.compare:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                baseline_report = json.load(f)
+        print(format_report(result, baseline_report))
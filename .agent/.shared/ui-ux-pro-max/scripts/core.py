@@ -5,14 +5,27 @@ UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
 import csv
+import bisect
+import heapq
+import mmap
+import os
+import pickle
 import re
+import sys
+import threading
+import time
+from array import array
 from pathlib import Path
 from math import log
-from collections import defaultdict
+from collections import Counter, OrderedDict
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
+INDEX_DIR = Path(__file__).parent.parent / ".index"
+INDEX_VERSION = 7
 MAX_RESULTS = 3
+QUERY_CACHE_SIZE = 1024
+STREAM_THRESHOLD_BYTES = 8 << 20  # larger CSVs stay on disk, see OffsetRowStore
 
 CSV_CONFIG = {
     "style": {
@@ -97,97 +110,920 @@ AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
 
 # ============ BM25 IMPLEMENTATION ============
+# Runs of word characters; equivalent to replacing punctuation with spaces and splitting
+_TOKEN_RE = re.compile(r'\w+')
+MIN_TOKEN_LEN = 3
+
+# Unknown query tokens ("glassmorph", "dashbord") are expanded to the closest
+# vocabulary tokens by character-trigram similarity before scoring. Each
+# expansion is weighted by its similarity divided by the number of expansions,
+# so together they never weigh more than one exactly matched token.
+FUZZY_MAX_EXPANSIONS = 2        # matches per unknown token; 0 disables expansion
+FUZZY_MIN_SIMILARITY = 0.6      # Dice coefficient over padded trigrams
+FUZZY_MIN_PREFIX_LEN = 4        # shorter unknown tokens don't prefix-match
+FUZZY_MAX_CANDIDATES = 64       # candidates ranked per unknown token
+FUZZY_MAX_GRAM_POSTINGS = 4096  # trigrams shared by more tokens are too common to count
+
+
+def tokenize(text):
+    """Lowercase, split, remove punctuation, filter short words"""
+    return [w for w in _TOKEN_RE.findall(str(text).lower()) if len(w) >= MIN_TOKEN_LEN]
+
+
+def _trigrams(token):
+    """Character trigrams of a token padded with spaces, so word starts and ends count"""
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _ms(seconds):
+    """Seconds to milliseconds, rounded for profile output"""
+    return round(seconds * 1000, 3)
+
+
+class Vocabulary:
+    """Token <-> integer id mapping shared by an index's documents and queries"""
+
+    def __init__(self):
+        self.ids = {}
+        self.tokens = []
+        self.grams = {}     # trigram -> array('I') of ids of tokens containing it
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def add(self, token):
+        """Return the id of token, assigning the next free id if it is new"""
+        term_id = self.ids.get(token)
+        if term_id is None:
+            term_id = self.ids[token] = len(self.tokens)
+            self.tokens.append(token)
+            grams = self.grams
+            for gram in _trigrams(token):
+                ids = grams.get(gram)
+                if ids is None:
+                    ids = grams[gram] = array('I')
+                ids.append(term_id)
+        return term_id
+
+    def get(self, token):
+        """Return the id of token, or None if it never occurred in the corpus"""
+        return self.ids.get(token)
+
+    def similar(self, token, doc_freqs=None):
+        """
+        (id, similarity) of known tokens close to token, best first.
+
+        A token matches when it extends token as a prefix or when their trigram
+        sets have a Dice coefficient of at least FUZZY_MIN_SIMILARITY. Prefix
+        matches rank first, then by similarity, then by id. With doc_freqs,
+        tokens that no longer occur in any document are skipped before the
+        FUZZY_MAX_CANDIDATES cut, as if they had never been added.
+
+        Candidates are gathered from the token's trigram lists, skipping lists
+        longer than FUZZY_MAX_GRAM_POSTINGS, so the work per query token is
+        bounded however large the vocabulary grows; similarities are then
+        computed exactly for at most FUZZY_MAX_CANDIDATES candidates.
+        """
+        grams = _trigrams(token)
+        shared = Counter()
+        for gram in grams:
+            ids = self.grams.get(gram, ())
+            if len(ids) <= FUZZY_MAX_GRAM_POSTINGS:
+                shared.update(ids)
+        if doc_freqs is not None:
+            shared = Counter({term_id: count for term_id, count in shared.items() if doc_freqs[term_id]})
+
+        matches = []
+        allow_prefix = len(token) >= FUZZY_MIN_PREFIX_LEN
+        for term_id, _ in shared.most_common(FUZZY_MAX_CANDIDATES):
+            candidate = self.tokens[term_id]
+            candidate_grams = _trigrams(candidate)
+            similarity = 2 * len(grams & candidate_grams) / (len(grams) + len(candidate_grams))
+            prefix = allow_prefix and candidate.startswith(token)
+            if prefix or similarity >= FUZZY_MIN_SIMILARITY:
+                matches.append((not prefix, -similarity, term_id))
+        matches.sort()
+        return [(term_id, -similarity) for _, similarity, term_id in matches]
+
+
 class BM25:
     """BM25 ranking algorithm for text search"""
 
     def __init__(self, k1=1.5, b=0.75):
         self.k1 = k1
         self.b = b
-        self.corpus = []
-        self.doc_lengths = []
+        self.vocab = Vocabulary()
+        self.doc_terms = []             # per document: array('I') of token ids
+        self.doc_lengths = array('I')
+        self.doc_norms = array('d')
         self.avgdl = 0
-        self.idf = {}
-        self.doc_freqs = defaultdict(int)
+        self.idf = array('d')           # by token id
+        self.doc_freqs = array('I')     # by token id
+        # Posting lists packed CSR-style: token id t owns entries
+        # post_offsets[t]:post_offsets[t + 1] of post_docs / post_tfs
+        self.post_offsets = array('I', [0])
+        self.post_docs = array('I')
+        self.post_tfs = array('I')
+        self._patches = {}              # token id -> staged (docs, tfs), see commit()
         self.N = 0
 
     def tokenize(self, text):
         """Lowercase, split, remove punctuation, filter short words"""
-        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
-        return [w for w in text.split() if len(w) > 2]
+        return tokenize(text)
+
+    def encode(self, text):
+        """
+        (token id, weight) of the query tokens, in order.
+
+        Known tokens weigh 1.0; unknown tokens expand to close known ones,
+        weighted below an exact match (see _expand).
+        """
+        terms = []
+        for token in tokenize(text):
+            term_id = self._known(token)
+            if term_id is not None:
+                terms.append((term_id, 1.0))
+            elif FUZZY_MAX_EXPANSIONS > 0:
+                terms.extend(self._expand(token))
+        return terms
+
+    def _known(self, token):
+        """Id of token if some document contains it, else None
+
+        Incremental updates keep the ids of tokens whose last occurrence was
+        deleted; those count as unknown, exactly as after a fresh build.
+        """
+        term_id = self.vocab.ids.get(token)
+        if term_id is not None and self.doc_freqs[term_id]:
+            return term_id
+        return None
+
+    def _expand(self, token):
+        """
+        Up to FUZZY_MAX_EXPANSIONS similar tokens that still occur in some document.
+
+        Each weighs its similarity divided by the number of expansions, so an
+        unknown token adds at most about as much as one exact match and a
+        typo cannot outweigh a correctly spelled word.
+        """
+        matches = self.vocab.similar(token, self.doc_freqs)[:FUZZY_MAX_EXPANSIONS]
+        return [(term_id, similarity / len(matches)) for term_id, similarity in matches]
 
     def fit(self, documents):
         """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
-        if self.N == 0:
-            return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
-        self.avgdl = sum(self.doc_lengths) / self.N
-
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
-
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+        add = self.vocab.add
+        self.doc_terms = [array('I', map(add, tokenize(doc))) for doc in documents]
+        self.doc_lengths = array('I', map(len, self.doc_terms))
+        self._pack_postings()
+        self._refresh_stats()
+
+    def _pack_postings(self):
+        """Rebuild the packed posting lists from doc_terms (token ids only, no tokenizing)"""
+        postings = [{} for _ in range(len(self.vocab))]
+        for idx, terms in enumerate(self.doc_terms):
+            for term_id in terms:
+                tfs = postings[term_id]
+                tfs[idx] = tfs.get(idx, 0) + 1
+        # Doc indexes ascend within each posting list
+        self.post_docs = array('I')
+        self.post_tfs = array('I')
+        self.post_offsets = array('I', [0])
+        for tfs in postings:
+            self.post_docs.extend(tfs.keys())
+            self.post_tfs.extend(tfs.values())
+            self.post_offsets.append(len(self.post_docs))
+        self._patches = {}
+
+    def _refresh_stats(self):
+        """Recompute N, average length, length norms, document frequencies and IDF"""
+        self.N = len(self.doc_terms)
+        self.avgdl = sum(self.doc_lengths) / self.N if self.N else 0
+        # Length normalisation part of the BM25 denominator, fixed per document.
+        # avgdl is 0 only when no document has a single token, so nothing can
+        # match; every doc_len is 0 too, so dividing by 1 leaves k1 * (1 - b).
+        avgdl = self.avgdl or 1
+        self.doc_norms = array('d', (self.k1 * (1 - self.b + self.b * doc_len / avgdl) for doc_len in self.doc_lengths))
+        offsets = self.post_offsets
+        self.doc_freqs = array('I', (offsets[t + 1] - offsets[t] for t in range(len(offsets) - 1)))
+        self.idf = array('d', (log((self.N - freq + 0.5) / (freq + 0.5) + 1) for freq in self.doc_freqs))
+
+    # ---- Incremental updates ----
+    # add/update/truncate stage posting changes in self._patches (one unpacked
+    # posting list per touched term); commit() folds them back into the packed
+    # arrays and refreshes N-dependent statistics. Scoring is only valid
+    # after commit().
+
+    def _posting(self, term_id):
+        """Mutable (docs, tfs) copy of one posting list, staged for commit()"""
+        patch = self._patches.get(term_id)
+        if patch is None:
+            if term_id + 1 < len(self.post_offsets):
+                start, end = self.post_offsets[term_id], self.post_offsets[term_id + 1]
+                patch = (self.post_docs[start:end], self.post_tfs[start:end])
+            else:
+                patch = (array('I'), array('I'))  # token first seen in this update
+            self._patches[term_id] = patch
+        return patch
+
+    def _set_tf(self, term_id, idx, tf):
+        """Set the frequency of a term in one document (0 removes the posting)"""
+        docs, tfs = self._posting(term_id)
+        pos = bisect.bisect_left(docs, idx)
+        present = pos < len(docs) and docs[pos] == idx
+        if tf == 0:
+            if present:
+                del docs[pos]
+                del tfs[pos]
+        elif present:
+            tfs[pos] = tf
+        else:
+            docs.insert(pos, idx)
+            tfs.insert(pos, tf)
+
+    def add_document(self, text):
+        """Append a document, returns its index"""
+        idx = len(self.doc_terms)
+        terms = array('I', map(self.vocab.add, tokenize(text)))
+        self.doc_terms.append(terms)
+        self.doc_lengths.append(len(terms))
+        for term_id, tf in Counter(terms).items():
+            self._set_tf(term_id, idx, tf)
+        return idx
+
+    def update_document(self, idx, text):
+        """Replace the text of document idx, touching only terms whose frequency changed"""
+        old = Counter(self.doc_terms[idx])
+        terms = array('I', map(self.vocab.add, tokenize(text)))
+        new = Counter(terms)
+        for term_id in old.keys() | new.keys():
+            if old[term_id] != new[term_id]:
+                self._set_tf(term_id, idx, new[term_id])
+        self.doc_terms[idx] = terms
+        self.doc_lengths[idx] = len(terms)
+
+    def truncate(self, n):
+        """Delete every document from index n onwards"""
+        for idx in range(n, len(self.doc_terms)):
+            for term_id in set(self.doc_terms[idx]):
+                self._set_tf(term_id, idx, 0)
+        del self.doc_terms[n:]
+        del self.doc_lengths[n:]
+
+    def commit(self):
+        """Fold staged posting changes into the packed arrays and refresh statistics"""
+        if self._patches:
+            offsets, post_docs, post_tfs = self.post_offsets, self.post_docs, self.post_tfs
+            docs, tfs, packed = array('I'), array('I'), array('I', [0])
+            for term_id in range(len(self.vocab)):
+                patch = self._patches.get(term_id)
+                if patch is None:
+                    start, end = offsets[term_id], offsets[term_id + 1]
+                    docs.extend(post_docs[start:end])
+                    tfs.extend(post_tfs[start:end])
+                else:
+                    docs.extend(patch[0])
+                    tfs.extend(patch[1])
+                packed.append(len(docs))
+            self.post_docs, self.post_tfs, self.post_offsets = docs, tfs, packed
+            self._patches = {}
+        self._refresh_stats()
+
+    def _accumulate(self, query):
+        """Sum BM25 contributions over the query terms' posting lists only"""
+        return self._accumulate_ids(self.encode(query))
+
+    def _accumulate_ids(self, terms):
+        scores = {}
+        k1_plus_1 = self.k1 + 1
+        doc_norms = self.doc_norms
+        offsets, post_docs, post_tfs = self.post_offsets, self.post_docs, self.post_tfs
+        for term_id, weight in terms:
+            start, end = offsets[term_id], offsets[term_id + 1]
+            idf = self.idf[term_id]
+            if weight == 1.0:
+                for idx, tf in zip(post_docs[start:end], post_tfs[start:end]):
+                    scores[idx] = scores.get(idx, 0) + idf * (tf * k1_plus_1) / (tf + doc_norms[idx])
+            else:
+                for idx, tf in zip(post_docs[start:end], post_tfs[start:end]):
+                    scores[idx] = scores.get(idx, 0) + weight * (idf * (tf * k1_plus_1) / (tf + doc_norms[idx]))
+        return scores
+
+    def top_k(self, query, k, profile=None):
+        """
+        Return the k best (doc index, score) pairs with score > 0, best first.
+
+        Pass a dict as profile to have per-phase timings (ms) and posting-list
+        statistics recorded into it.
+        """
+        if profile is not None:
+            return self._top_k_profiled(query, k, profile)
+        scores = self._accumulate(query)
+        # Ties keep document order, same as a stable sort over all documents
+        return heapq.nlargest(k, scores.items(), key=lambda x: (x[1], -x[0]))
+
+    def _top_k_profiled(self, query, k, profile):
+        clock = time.perf_counter
+        started = clock()
+        terms = self.encode(query)
+        encoded = clock()
+        scores = self._accumulate_ids(terms)
+        scored = clock()
+        ranked = heapq.nlargest(k, scores.items(), key=lambda x: (x[1], -x[0]))
+        selected = clock()
+
+        tokens = tokenize(query)
+        known = sum(1 for token in tokens if self._known(token) is not None)
+        offsets = self.post_offsets
+        posting_lengths = [offsets[term_id + 1] - offsets[term_id] for term_id, _ in terms]
+        profile.update({
+            "tokenize_ms": _ms(encoded - started),
+            "score_ms": _ms(scored - encoded),
+            "select_ms": _ms(selected - scored),
+            "query_tokens": len(tokens),
+            "known_tokens": known,
+            "expanded_terms": len(terms) - known,
+            "posting_lengths": posting_lengths,
+            "postings_touched": sum(posting_lengths),
+            "docs_scored": len(scores),
+            "docs_total": self.N,
+        })
+        return ranked
 
     def score(self, query):
         """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
+        scores = self._accumulate(query)
+        ranked = [(idx, scores.get(idx, 0)) for idx in range(self.N)]
+        return sorted(ranked, key=lambda x: x[1], reverse=True)
 
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+# ============ ROW STORE ============
+class RowView:
+    """Read-only dict-like view of one RowStore row (DictReader row semantics)"""
 
-            scores.append((idx, score))
+    __slots__ = ("_store", "_idx")
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+    def __init__(self, store, idx):
+        self._store = store
+        self._idx = idx
 
+    def __getitem__(self, col):
+        column = self._store.columns.get(col)
+        if column is None:
+            raise KeyError(col)
+        return column[self._idx]
 
-# ============ SEARCH FUNCTIONS ============
+    def __contains__(self, col):
+        return col in self._store.columns
+
+    def __iter__(self):
+        return iter(self._store.columns)
+
+    def __len__(self):
+        return len(self._store.columns)
+
+    def get(self, col, default=None):
+        column = self._store.columns.get(col)
+        return default if column is None else column[self._idx]
+
+    def keys(self):
+        return self._store.columns.keys()
+
+    def items(self):
+        return [(col, column[self._idx]) for col, column in self._store.columns.items()]
+
+    def values(self):
+        return [column[self._idx] for column in self._store.columns.values()]
+
+
+class RowStore:
+    """
+    Columnar in-memory CSV rows: one list per column instead of one dict per row.
+
+    Column names are interned and repeated cell values share a single string
+    object, so wide CSVs with recurring values (categories, severities, fonts)
+    cost far fewer objects. Rows are exposed as RowView objects and only the
+    requested columns are ever materialized.
+    """
+
+    def __init__(self, fieldnames=()):
+        self.fieldnames = list(fieldnames)
+        self.columns = {sys.intern(name): [] for name in fieldnames}
+        self._pool = {}
+        self._size = 0
+
+    @classmethod
+    def from_csv(cls, filepath):
+        """Load a CSV with the same row semantics as csv.DictReader"""
+        return cls.from_records(*_read_csv_records(filepath))
+
+    @classmethod
+    def from_records(cls, fieldnames, records):
+        """Build a store from a header and already parsed, non-blank records"""
+        store = cls(fieldnames)
+        for record in records:
+            store.append(record, fieldnames)
+        store._pool = None  # only needed while loading
+        return store
+
+    def append(self, record, fieldnames):
+        """Add one parsed CSV record; short records are padded with None like DictReader"""
+        if self._pool is None:
+            self._pool = {value: value for column in self.columns.values() for value in column if value is not None}
+        pool = self._pool
+        values = dict(zip(fieldnames, record))  # duplicate headers: last one wins
+        for name, column in self.columns.items():
+            value = values.get(name)
+            column.append(value if value is None else pool.setdefault(value, value))
+        self._size += 1
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, idx):
+        if not -self._size <= idx < self._size:
+            raise IndexError("row index out of range")
+        return RowView(self, idx % self._size)
+
+    def __iter__(self):
+        return (RowView(self, idx) for idx in range(self._size))
+
+    def __getstate__(self):
+        # The value pool only matters while appending; pickle's memo keeps
+        # shared values shared in the stored index
+        return {"fieldnames": self.fieldnames, "columns": self.columns, "size": self._size}
+
+    def __setstate__(self, state):
+        self.fieldnames = state["fieldnames"]
+        self.columns = {sys.intern(name): column for name, column in state["columns"].items()}
+        self._size = state["size"]
+        self._pool = None  # rebuilt on the next append
+
+
+def _record_row(fieldnames, record):
+    """Dict for one parsed record; short records are padded with None like csv.DictReader"""
+    row = dict.fromkeys(fieldnames)
+    row.update(zip(fieldnames, record))
+    return row
+
+
+class _OffsetLines:
+    """Line iterator over UTF-8 bytes that tracks the byte offset of the next line"""
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.pos = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        pos = self.pos
+        if pos >= len(self.buf):
+            raise StopIteration
+        end = self.buf.find(b"\n", pos)
+        end = len(self.buf) if end < 0 else end + 1
+        self.pos = end
+        line = self.buf[pos:end].decode("utf-8")
+        # Same newline translation as a text-mode open()
+        return line[:-2] + "\n" if line.endswith("\r\n") else line
+
+
+class OffsetRowStore:
+    """
+    CSV rows left on disk: only the byte range of each record is kept.
+
+    Built in a single streaming pass over a memory-mapped file (see scan()),
+    so indexing a very large CSV never holds its rows in memory. Indexing a
+    row reads and parses just that record, which is all search needs for the
+    few winning rows. Rows follow csv.DictReader semantics like RowStore.
+    """
+
+    def __init__(self, filepath, fieldnames=()):
+        self.filepath = str(filepath)
+        self.fieldnames = list(fieldnames)
+        self.starts = array('Q')
+        self.ends = array('Q')
+
+    @classmethod
+    def scan(cls, filepath):
+        """
+        Open a CSV for one streaming pass.
+
+        Returns (store, records): the header is read up front and the store
+        records each row's byte range as the non-blank records are consumed.
+        """
+        store = cls(filepath)
+        f = open(filepath, 'rb')
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file, nothing to map
+            buf = b""
+        finally:
+            f.close()
+
+        lines = _OffsetLines(buf)
+        reader = csv.reader(lines)
+        store.fieldnames = next(reader, [])
+
+        def records():
+            try:
+                while True:
+                    start = lines.pos
+                    record = next(reader, None)
+                    if record is None:
+                        return
+                    if record:  # DictReader skips blank lines
+                        store.starts.append(start)
+                        store.ends.append(lines.pos)
+                        yield record
+            finally:
+                if isinstance(buf, mmap.mmap):
+                    buf.close()
+
+        return store, records()
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, idx):
+        start, end = self.starts[idx], self.ends[idx]
+        with open(self.filepath, 'rb') as f:
+            f.seek(start)
+            chunk = f.read(end - start)
+        return _record_row(self.fieldnames, next(csv.reader(_OffsetLines(chunk))))
+
+    def __iter__(self):
+        # One sequential pass instead of a seek per row
+        _, records = OffsetRowStore.scan(self.filepath)
+        return (_record_row(self.fieldnames, record) for record in records)
+
+
+# ============ PERSISTENT INDEX ============
 def _load_csv(filepath):
     """Load CSV and return list of dicts"""
     with open(filepath, 'r', encoding='utf-8') as f:
         return list(csv.DictReader(f))
 
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
+def _read_csv_records(filepath):
+    """Return (header, records) with blank lines skipped like csv.DictReader"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        fieldnames = next(reader, [])
+        return fieldnames, [record for record in reader if record]
+
+
+def _row_hash(record):
+    """64-bit content hash of one parsed CSV record"""
+    import hashlib  # deferred: only index builds and updates hash rows
+    digest = hashlib.blake2b("\x1f".join(record).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+# Fitted BM25 state and rows are pickled per CSV under INDEX_DIR and kept in
+# _INDEXES for the life of the process. An index is reused while the CSV's
+# mtime/size match; if only the mtime moved (checkout, touch) the content
+# hash decides whether a rebuild is needed. When the content did change, rows
+# are compared by per-row hash and only edited, added or deleted rows are
+# re-tokenized (see _update_index).
+_INDEXES = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def _file_hash(filepath):
+    """SHA-256 hex digest of a file's contents"""
+    import hashlib
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _index_path(filepath):
+    """On-disk index location for a CSV (stacks/react.csv -> stacks__react.idx)"""
+    filepath = Path(filepath).resolve()
+    try:
+        parts = filepath.relative_to(DATA_DIR.resolve()).with_suffix("").parts
+    except ValueError:
+        import hashlib
+        parts = (filepath.stem, hashlib.sha1(str(filepath).encode("utf-8")).hexdigest()[:12])
+    return INDEX_DIR / ("__".join(parts) + ".idx")
+
+
+def _read_index(path):
+    """Load a pickled index with a single read; None if missing or unreadable"""
+    try:
+        with open(path, 'rb') as f:
+            return pickle.loads(f.read())
+    except Exception:
+        # Missing, truncated or written by an incompatible version: rebuild
+        return None
+
+
+def _write_index(path, index):
+    """Atomically write an index; silently skipped on read-only checkouts"""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, 'wb') as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def _document(row, search_cols):
+    """Build one document from the search columns of a row"""
+    return " ".join(str(row.get(col, "")) for col in search_cols)
+
+
+def _documents(rows, search_cols):
+    """Build documents from search columns"""
+    return [_document(row, search_cols) for row in rows]
+
+
+def _open_rows(filepath, stat):
+    """
+    Return (rows, records) for a CSV.
+
+    Small files are parsed into a RowStore up front. Files of at least
+    STREAM_THRESHOLD_BYTES become an OffsetRowStore that is filled in as the
+    records iterator is consumed, so callers must exhaust it exactly once.
+    """
+    if stat.st_size >= STREAM_THRESHOLD_BYTES:
+        return OffsetRowStore.scan(filepath)
+    fieldnames, records = _read_csv_records(filepath)
+    return RowStore.from_records(fieldnames, records), records
+
+
+def _build_index(filepath, search_cols, stat):
+    """Read the CSV, tokenize every row and fit BM25 in one pass over the records"""
+    data, records = _open_rows(filepath, stat)
+    row_hashes = array('Q')
+
+    def documents():
+        for record in records:
+            row_hashes.append(_row_hash(record))
+            yield _document(_record_row(data.fieldnames, record), search_cols)
+
+    bm25 = BM25()
+    bm25.fit(documents())
+
+    return {
+        "version": INDEX_VERSION,
+        "search_cols": list(search_cols),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": _file_hash(filepath),
+        "fieldnames": data.fieldnames,
+        "row_hashes": row_hashes,
+        "bm25": bm25,
+        "rows": data
+    }
+
+
+def _update_index(index, filepath, search_cols, stat):
+    """
+    Bring a stale index up to date by re-tokenizing only the rows whose hash changed.
+
+    Edits in place and appends/deletes at the end patch the posting lists of
+    the touched terms directly. Inserts or deletes in the middle shift every
+    later doc index, so postings are repacked from the cached token ids of
+    the unchanged rows (still no re-tokenizing). Returns None when the header
+    changed, in which case the caller does a full build.
+    """
+    data, records = _open_rows(filepath, stat)
+    new_hashes = array('Q', map(_row_hash, records))
+    if data.fieldnames != index["fieldnames"]:
+        return None
+
+    old_hashes = index["row_hashes"]
+    n_old, n_new = len(old_hashes), len(new_hashes)
+    bm25 = index["bm25"]
+
+    shared = min(n_old, n_new)
+    suffix = 0
+    while suffix < shared and old_hashes[n_old - suffix - 1] == new_hashes[n_new - suffix - 1]:
+        suffix += 1
+
+    if n_old == n_new or suffix == 0:
+        # Row positions are stable: patch changed rows, then the tail
+        for idx in range(shared):
+            if old_hashes[idx] != new_hashes[idx]:
+                bm25.update_document(idx, _document(data[idx], search_cols))
+        if n_new < n_old:
+            bm25.truncate(n_new)
+        for idx in range(n_old, n_new):
+            bm25.add_document(_document(data[idx], search_cols))
+        bm25.commit()
+    else:
+        prefix = 0
+        while prefix < shared - suffix and old_hashes[prefix] == new_hashes[prefix]:
+            prefix += 1
+        add = bm25.vocab.add
+        middle = [array('I', map(add, tokenize(_document(data[idx], search_cols))))
+                  for idx in range(prefix, n_new - suffix)]
+        bm25.doc_terms[prefix:n_old - suffix] = middle
+        bm25.doc_lengths = array('I', map(len, bm25.doc_terms))
+        bm25._pack_postings()
+        bm25._refresh_stats()
+
+    index.update({
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": _file_hash(filepath),
+        "row_hashes": new_hashes,
+        "rows": data
+    })
+    return index
+
+
+def _load_or_build_index(filepath, search_cols, stat):
+    """Reuse the on-disk index when it still describes the CSV, else update or rebuild it"""
+    path = _index_path(filepath)
+    index = _read_index(path)
+
+    if (isinstance(index, dict) and index.get("version") == INDEX_VERSION
+            and index.get("search_cols") == list(search_cols)):
+        if index["mtime_ns"] == stat.st_mtime_ns and index["size"] == stat.st_size:
+            return index
+        if index["size"] == stat.st_size and index["sha256"] == _file_hash(filepath):
+            index["mtime_ns"] = stat.st_mtime_ns
+            _write_index(path, index)
+            return index
+        index = _update_index(index, filepath, search_cols, stat)
+        if index is not None:
+            _write_index(path, index)
+            return index
+
+    index = _build_index(filepath, search_cols, stat)
+    _write_index(path, index)
+    return index
+
+
+def load_index(filepath, search_cols):
+    """Return the BM25 index for a CSV, loading or rebuilding it only when the file changed"""
+    filepath = Path(filepath)
+    key = (str(filepath), tuple(search_cols))
+    stat = filepath.stat()
+
+    index = _INDEXES.get(key)
+    if index is None or index["mtime_ns"] != stat.st_mtime_ns or index["size"] != stat.st_size:
+        with _INDEX_LOCK:
+            index = _INDEXES.get(key)
+            if index is None or index["mtime_ns"] != stat.st_mtime_ns or index["size"] != stat.st_size:
+                stale = index
+                index = _load_or_build_index(filepath, search_cols, stat)
+                _INDEXES[key] = index
+                if stale is not None and stale["sha256"] != index["sha256"]:
+                    _QUERY_CACHE.invalidate(lambda k: k[:2] == key)
+    return index
+
+
+def clear_index_cache():
+    """Forget every in-process index; the next query reloads from disk"""
+    with _INDEX_LOCK:
+        _INDEXES.clear()
+        _FEDERATED.clear()
+
+
+def build_indexes():
+    """Prebuild the on-disk index for every domain and stack, returns the CSV paths indexed"""
+    targets = [(config["file"], config["search_cols"]) for config in CSV_CONFIG.values()]
+    targets += [(config["file"], _STACK_COLS["search_cols"]) for config in STACK_CONFIG.values()]
+
+    built = []
+    for filename, search_cols in targets:
+        filepath = DATA_DIR / filename
+        if filepath.exists():
+            load_index(filepath, search_cols)
+            built.append(str(filepath))
+    return built
+
+
+# ============ QUERY CACHE ============
+class _LRUCache:
+    """Thread-safe bounded LRU mapping with hit/miss/eviction counters"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return the cached value (marking it recently used) or None"""
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, predicate):
+        """Drop every entry whose key matches predicate"""
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def info(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._data),
+                "maxsize": self.maxsize
+            }
+
+
+# Keyed on (file, search cols, output cols, query tokens, max_results, CSV hash):
+# an edited CSV gets a new hash, so stale results can never be served
+_QUERY_CACHE = _LRUCache(QUERY_CACHE_SIZE)
+
+
+def search_cache_info():
+    """Hit/miss/eviction counters and size of the query-result cache"""
+    return _QUERY_CACHE.info()
+
+
+def clear_search_cache():
+    """Empty the query-result cache and reset its counters"""
+    _QUERY_CACHE.clear()
+
+
+# ============ SEARCH FUNCTIONS ============
+def _search_csv(filepath, search_cols, output_cols, query, max_results, profile=None):
+    """
+    Core search function using BM25.
+
+    With a profile dict, records where the time went: index load, tokenizing,
+    scoring, top-k selection and row materialization (see BM25.top_k). A
+    profiled query always runs in full, even when the query cache holds it
+    ("cache": "hit-bypassed"), so repeated slow queries can be profiled too;
+    the fresh result still refreshes the cache.
+    """
     if not filepath.exists():
         return []
 
-    data = _load_csv(filepath)
+    started = time.perf_counter() if profile is not None else 0
+    index = load_index(filepath, search_cols)
+    bm25 = index["bm25"]
+    cache_key = (str(filepath), tuple(search_cols), tuple(output_cols),
+                 tuple(tokenize(query)), max_results, index["sha256"])
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+    results = _QUERY_CACHE.get(cache_key)
+    if profile is not None:
+        profile["index_ms"] = _ms(time.perf_counter() - started)
+        profile["cache"] = "miss" if results is None else "hit-bypassed"
+        results = None
+    if results is None:
+        ranked = bm25.top_k(query, max_results, profile)
+        materialize_started = time.perf_counter() if profile is not None else 0
+        results = _collect_results(index["rows"], ranked, output_cols)
+        if profile is not None:
+            profile["materialize_ms"] = _ms(time.perf_counter() - materialize_started)
+        _QUERY_CACHE.put(cache_key, results)
 
-    # BM25 search
-    bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
+    # Copies, so callers can't mutate what later queries will be served
+    results = [dict(row) for row in results]
+    if profile is not None:
+        profile["total_ms"] = _ms(time.perf_counter() - started)
+    return results
 
-    # Get top results with score > 0
+
+def _collect_results(data, ranked, output_cols):
+    """Materialize output columns for ranked (doc index, score) pairs with score > 0"""
     results = []
-    for idx, score in ranked[:max_results]:
+    for idx, score in ranked:
         if score > 0:
             row = data[idx]
             results.append({col: row.get(col, "") for col in output_cols if col in row})
-
     return results
 
 
@@ -214,8 +1050,14 @@ def detect_domain(query):
     return best if scores[best] > 0 else "style"
 
 
-def search(query, domain=None, max_results=MAX_RESULTS):
-    """Main search function with auto-domain detection"""
+def search(query, domain=None, max_results=MAX_RESULTS, profile=False):
+    """
+    Main search function with auto-domain detection ("all" searches every domain and stack).
+
+    profile=True adds a "profile" dict to single-domain results (see _search_csv).
+    """
+    if domain == FEDERATED_DOMAIN:
+        return search_all(query, max_results)
     if domain is None:
         domain = detect_domain(query)
 
@@ -225,19 +1067,23 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    stats = {} if profile else None
+    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results, stats)
 
-    return {
+    result = {
         "domain": domain,
         "query": query,
         "file": config["file"],
         "count": len(results),
         "results": results
     }
+    if profile:
+        result["profile"] = stats
+    return result
 
 
-def search_stack(query, stack, max_results=MAX_RESULTS):
-    """Search stack-specific guidelines"""
+def search_stack(query, stack, max_results=MAX_RESULTS, profile=False):
+    """Search stack-specific guidelines (profile=True adds a "profile" dict, as in search)"""
     if stack not in STACK_CONFIG:
         return {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
 
@@ -246,9 +1092,10 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"Stack file not found: {filepath}", "stack": stack}
 
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
+    stats = {} if profile else None
+    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results, stats)
 
-    return {
+    result = {
         "domain": "stack",
         "stack": stack,
         "query": query,
@@ -256,3 +1103,107 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+    if profile:
+        result["profile"] = stats
+    return result
+
+
+# ============ FEDERATED SEARCH ============
+# One BM25 index over every domain and stack CSV. Documents of each source sit
+# in one contiguous doc-index range, so a posting's source is a bisect away.
+# IDF is computed over the whole federated corpus, so scores are comparable
+# across domains (and differ slightly from single-domain search).
+FEDERATED_DOMAIN = "all"
+_FEDERATED = {}
+
+
+def _federated_sources():
+    """(name, filepath, search_cols, output_cols) for every existing domain and stack CSV"""
+    sources = [(domain, DATA_DIR / config["file"], config["search_cols"], config["output_cols"])
+               for domain, config in CSV_CONFIG.items()]
+    sources += [(f"stack:{stack}", DATA_DIR / config["file"], _STACK_COLS["search_cols"], _STACK_COLS["output_cols"])
+                for stack, config in STACK_CONFIG.items()]
+    return [source for source in sources if source[1].exists()]
+
+
+def load_federated_index():
+    """Return the federated index, rebuilding it only when a source CSV changed"""
+    sources = _federated_sources()
+    indexes = [load_index(filepath, search_cols) for _, filepath, search_cols, _ in sources]
+    signature = [(name, str(filepath), list(search_cols), index["sha256"])
+                 for (name, filepath, search_cols, _), index in zip(sources, indexes)]
+
+    federated = _FEDERATED.get("index")
+    if federated is not None and federated["signature"] == signature:
+        return federated
+
+    with _INDEX_LOCK:
+        path = INDEX_DIR / "federated.idx"
+        federated = _read_index(path)
+        if not (isinstance(federated, dict) and federated.get("version") == INDEX_VERSION
+                and federated.get("signature") == signature):
+            documents = []
+            doc_starts = array('I')
+            for (_, _, search_cols, _), index in zip(sources, indexes):
+                doc_starts.append(len(documents))
+                documents.extend(_documents(index["rows"], search_cols))
+            bm25 = BM25()
+            bm25.fit(documents)
+            federated = {"version": INDEX_VERSION, "signature": signature, "bm25": bm25, "doc_starts": doc_starts}
+            _write_index(path, federated)
+        _FEDERATED["index"] = federated
+    return federated
+
+
+def search_all(query, max_results=MAX_RESULTS):
+    """Search every domain and stack in one scoring pass: per-domain top-k plus a global ranking"""
+    federated = load_federated_index()
+    sources = _federated_sources()
+    bm25, doc_starts = federated["bm25"], federated["doc_starts"]
+
+    cache_key = (FEDERATED_DOMAIN, tuple(tokenize(query)), max_results,
+                 tuple(sha for *_, sha in federated["signature"]))
+    cached = _QUERY_CACHE.get(cache_key)
+    if cached is None:
+        # Bucket matching documents by source: (doc index, score) pairs per source position
+        buckets = {}
+        for idx, score in bm25._accumulate(query).items():
+            buckets.setdefault(bisect.bisect_right(doc_starts, idx) - 1, []).append((idx, score))
+
+        rank_key = lambda x: (x[1], -x[0])
+        per_source = {pos: heapq.nlargest(max_results, hits, key=rank_key) for pos, hits in buckets.items()}
+        overall = heapq.nlargest(max_results, (hit for hits in per_source.values() for hit in hits), key=rank_key)
+        cached = (per_source, overall)
+        _QUERY_CACHE.put(cache_key, cached)
+    per_source, overall = cached
+
+    def materialize(pos, ranked):
+        _, filepath, search_cols, output_cols = sources[pos]
+        rows = load_index(filepath, search_cols)["rows"]
+        start = doc_starts[pos]
+        return _collect_results(rows, [(idx - start, score) for idx, score in ranked], output_cols)
+
+    domains = {}
+    for pos in sorted(per_source):
+        name, filepath = sources[pos][0], sources[pos][1]
+        results = materialize(pos, per_source[pos])
+        domains[name] = {
+            "file": str(filepath.relative_to(DATA_DIR).as_posix()),
+            "count": len(results),
+            "results": results
+        }
+
+    results = []
+    for idx, score in overall:
+        pos = bisect.bisect_right(doc_starts, idx) - 1
+        row = materialize(pos, [(idx, score)])[0]
+        results.append({"Domain": sources[pos][0], "Score": round(score, 4), **row})
+
+    return {
+        "domain": FEDERATED_DOMAIN,
+        "query": query,
+        "file": "all domains and stacks",
+        "count": len(results),
+        "results": results,
+        "domains": domains
+    }
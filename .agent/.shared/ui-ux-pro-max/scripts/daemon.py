@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Daemon - resident search server on a Unix domain socket.
+
+Keeps every domain and stack index warm in memory so agents that shell out
+to search.py many times per task skip interpreter startup, imports and index
+loading on every call. search.py talks to it automatically when it is
+running and falls back to in-process search otherwise.
+
+Protocol: one JSON object per line in each direction.
+    -> {"op": "search", "args": {"query": "glassmorphism", "domain": "style"}}
+    <- {"ok": true, "result": {...}}
+
+Operations: search, search_stack, generate_design_system, ping, shutdown
+
+Usage:
+    python daemon.py                  # serve on the default socket
+    python daemon.py --socket /tmp/uipro.sock
+    python daemon.py --watch 2        # re-check the CSVs every 2 seconds
+"""
+
+import json
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+
+# ============ CONFIGURATION ============
+SOCKET_ENV = "UIPRO_SOCKET"
+CLIENT_TIMEOUT = 30.0
+
+
+def _runtime_dir() -> Path:
+    """Per-user socket directory: $XDG_RUNTIME_DIR, else a private folder in the temp dir."""
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return Path(runtime)
+    uid = os.getuid() if hasattr(os, "getuid") else "user"
+    return Path(tempfile.gettempdir()) / f"ui-ux-pro-max-{uid}"
+
+
+def default_socket_path() -> str:
+    """
+    Socket path from $UIPRO_SOCKET, else a per-user, per-checkout file in _runtime_dir().
+
+    The name includes a short hash of DATA_DIR, so search.py in one checkout
+    is never answered by a daemon serving another checkout's data.
+    """
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    from core import DATA_DIR
+    checkout = format(zlib.crc32(str(DATA_DIR.resolve()).encode("utf-8")), "08x")
+    return str(_runtime_dir() / f"ui-ux-pro-max-{checkout}.sock")
+
+
+def _owned_by_us(path: str) -> bool:
+    """True if path is a socket owned by the current user (anyone else's answers are not trusted)."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def _private_dir(directory: Path):
+    """Create directory as 0700 if needed and refuse one another user owns or can write to."""
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise SystemExit(f"Refusing to use {directory}: it must be a directory owned by you with mode 0700")
+
+
+# ============ CLIENT ============
+def request(op: str, socket_path: str = None, **args):
+    """
+    Send one request to a running daemon.
+
+    Returns the decoded result, or None when no daemon is listening so the
+    caller can fall back to in-process search. Errors raised inside the
+    daemon are re-raised here as RuntimeError.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = socket_path or default_socket_path()
+    if hasattr(os, "getuid") and not _owned_by_us(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CLIENT_TIMEOUT)
+            sock.connect(path)
+            sock.sendall(json.dumps({"op": op, "args": args}).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+
+    response = json.loads(line)
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error", "daemon request failed"))
+    return response.get("result")
+
+
+# ============ SERVER ============
+def _handle_search(args: dict):
+    from core import search
+    return search(args["query"], args.get("domain"), args.get("max_results", 3), args.get("profile", False))
+
+
+def _handle_search_stack(args: dict):
+    from core import search_stack
+    return search_stack(args["query"], args["stack"], args.get("max_results", 3), args.get("profile", False))
+
+
+def _handle_generate_design_system(args: dict):
+    from design_system import generate_design_system
+    return generate_design_system(
+        args["query"],
+        args.get("project_name"),
+        args.get("output_format", "ascii"),
+        persist=args.get("persist", False),
+        page=args.get("page"),
+        output_dir=args.get("output_dir"),
+        pages=args.get("pages")
+    )
+
+
+HANDLERS = {
+    "search": _handle_search,
+    "search_stack": _handle_search_stack,
+    "generate_design_system": _handle_generate_design_system,
+    "ping": lambda args: "pong",
+}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answers newline-delimited JSON requests until the client disconnects."""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                message = json.loads(line)
+                op = message.get("op")
+                if op == "shutdown":
+                    self._reply({"ok": True, "result": "bye"})
+                    # shutdown() blocks until serve_forever returns, so hand it off
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    return
+                if op not in HANDLERS:
+                    raise ValueError(f"Unknown op: {op}. Available: {', '.join(HANDLERS)}, shutdown")
+                self._reply({"ok": True, "result": HANDLERS[op](message.get("args") or {})})
+            except Exception as e:
+                self._reply({"ok": False, "error": f"{type(e).__name__}: {e}"})
+
+    def _reply(self, payload: dict):
+        self.wfile.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class SearchServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _watch(interval: float, stop: threading.Event):
+    """Poll the data directory; changed CSVs are reindexed incrementally before the next query."""
+    from core import build_indexes
+    while not stop.wait(interval):
+        try:
+            build_indexes()
+        except Exception as e:  # a half-written CSV: try again next tick
+            print(f"ui-ux-pro-max daemon: reindex failed: {type(e).__name__}: {e}")
+
+
+def serve(socket_path: str = None, watch: float = None):
+    """Warm every index, then serve requests until shutdown or Ctrl+C."""
+    from core import build_indexes
+    import design_system  # noqa: F401  (import once up front, not on first request)
+
+    path = socket_path or default_socket_path()
+    if not socket_path and not os.environ.get(SOCKET_ENV) and hasattr(os, "getuid"):
+        _private_dir(Path(path).parent)
+    if request("ping", path) == "pong":
+        raise SystemExit(f"A daemon is already listening on {path}")
+    if os.path.lexists(path):
+        os.unlink(path)  # stale socket left by a crashed daemon
+
+    indexed = build_indexes()
+    # The socket is created 0600 rather than chmodded after bind, so there is
+    # no window in which another user can connect. umask is process-wide, so
+    # this runs before the watcher thread starts writing index files.
+    umask = os.umask(0o177)
+    try:
+        server = SearchServer(path, _RequestHandler)
+    finally:
+        os.umask(umask)
+    stop = threading.Event()
+    if watch:
+        threading.Thread(target=_watch, args=(watch, stop), daemon=True).start()
+    with server:
+        print(f"ui-ux-pro-max daemon: {len(indexed)} indexes warm, listening on {path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="UI Pro Max search daemon")
+    parser.add_argument("--socket", type=str, default=None, help=f"Unix socket path (default: ${SOCKET_ENV}, else a per-user directory: $XDG_RUNTIME_DIR or a private one in the temp dir)")
+    parser.add_argument("--stop", action="store_true", help="Ask a running daemon to shut down")
+    parser.add_argument("--watch", type=float, default=None, metavar="SECONDS", help="Poll the CSVs and reindex changed rows every SECONDS")
+
+    args = parser.parse_args()
+
+    if args.stop:
+        print("Stopped" if request("shutdown", args.socket) else "No daemon running")
+    else:
+        serve(args.socket, args.watch)
@@ -11,14 +11,24 @@ Usage:
     # With persistence (Master + Overrides pattern)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True, page="dashboard")
+    result = generate_design_system("SaaS dashboard", "My Project", persist=True, pages=["dashboard", "checkout"])
+
+    # Many projects at once, streamed as each one completes
+    for position, job, output in generate_design_systems([{"query": "SaaS dashboard"}, "fintech crypto"]):
+        print(output)
 """
 
 import csv
 import json
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from core import search, DATA_DIR
+from core import search, tokenize, build_indexes, load_index, CSV_CONFIG, DATA_DIR, INDEX_VERSION
 
 
 # ============ CONFIGURATION ============
@@ -31,6 +41,29 @@ SEARCH_CONFIG = {
     "landing": {"max_results": 2},
     "typography": {"max_results": 2}
 }
+RULE_CACHE_SIZE = 1024
+
+# Domains whose searches don't depend on the product category run on this
+# pool alongside the product lookup; shared so repeated generations reuse threads
+_SEARCH_POOL = None
+_SEARCH_POOL_LOCK = threading.Lock()
+
+
+def _search_pool() -> ThreadPoolExecutor:
+    global _SEARCH_POOL
+    with _SEARCH_POOL_LOCK:
+        if _SEARCH_POOL is None:
+            _SEARCH_POOL = ThreadPoolExecutor(max_workers=len(SEARCH_CONFIG), thread_name_prefix="design-search")
+        return _SEARCH_POOL
+
+
+def _timed(timings: dict, stage: str, func, *args):
+    """Run func(*args) and record its wall time in milliseconds under timings[stage]."""
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        timings[stage] = round((time.perf_counter() - start) * 1000, 3)
 
 
 # ============ DESIGN SYSTEM GENERATOR ============
@@ -39,6 +72,7 @@ class DesignSystemGenerator:
 
     def __init__(self):
         self.reasoning_data = self._load_reasoning()
+        self._index_reasoning()
 
     def _load_reasoning(self) -> list:
         """Load reasoning rules from CSV."""
@@ -48,48 +82,98 @@ class DesignSystemGenerator:
         with open(filepath, 'r', encoding='utf-8') as f:
             return list(csv.DictReader(f))
 
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
-        results = {}
-        for domain, config in SEARCH_CONFIG.items():
-            if domain == "style" and style_priority:
-                # For style, also search with priority keywords
-                priority_query = " ".join(style_priority[:2]) if style_priority else query
-                combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
-            else:
-                results[domain] = search(query, domain, config["max_results"])
-        return results
+    def _index_reasoning(self):
+        """Precompute rule lookups and parsed reasoning once per generator."""
+        self._rule_exact = {}       # lowercase UI_Category -> first rule position
+        self._rule_categories = []  # lowercase UI_Category per rule, file order
+        self._rule_keywords = {}    # UI_Category keyword -> first rule position
+        self._rule_reasoning = []   # _apply_reasoning output per rule position
+        self._rule_cache = {}       # lowercase category -> resolved position (or None)
 
-    def _find_reasoning_rule(self, category: str) -> dict:
-        """Find matching reasoning rule for a category."""
+        for position, rule in enumerate(self.reasoning_data):
+            ui_cat = rule.get("UI_Category", "").lower()
+            self._rule_exact.setdefault(ui_cat, position)
+            self._rule_categories.append(ui_cat)
+            for keyword in ui_cat.replace("/", " ").replace("-", " ").split():
+                self._rule_keywords.setdefault(keyword, position)
+
+            # Parse decision rules JSON
+            decision_rules = {}
+            try:
+                decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
+            except json.JSONDecodeError:
+                pass
+
+            self._rule_reasoning.append({
+                "pattern": rule.get("Recommended_Pattern", ""),
+                "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
+                "color_mood": rule.get("Color_Mood", ""),
+                "typography_mood": rule.get("Typography_Mood", ""),
+                "key_effects": rule.get("Key_Effects", ""),
+                "anti_patterns": rule.get("Anti_Patterns", ""),
+                "decision_rules": decision_rules,
+                "severity": rule.get("Severity", "MEDIUM")
+            })
+
+    def _rule_position(self, category: str):
+        """Position of the matching reasoning rule for a category, or None."""
         category_lower = category.lower()
+        if category_lower in self._rule_cache:
+            return self._rule_cache[category_lower]
 
         # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
+        position = self._rule_exact.get(category_lower)
 
         # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
+        if position is None:
+            for i, ui_cat in enumerate(self._rule_categories):
+                if ui_cat in category_lower or category_lower in ui_cat:
+                    position = i
+                    break
+
+        # Try keyword match (earliest rule owning any keyword found in the category)
+        if position is None:
+            matches = [i for kw, i in self._rule_keywords.items() if kw in category_lower]
+            position = min(matches) if matches else None
+
+        if len(self._rule_cache) >= RULE_CACHE_SIZE:
+            self._rule_cache.clear()
+        self._rule_cache[category_lower] = position
+        return position
+
+    def _domain_query(self, domain: str, query: str, style_priority: list = None) -> str:
+        """Query sent to a domain; style also searches with the top priority keywords."""
+        if domain == "style" and style_priority:
+            priority_query = " ".join(style_priority[:2])
+            return f"{query} {priority_query}"
+        return query
+
+    def _submit_searches(self, domains: list, query: str, style_priority: list = None, timings: dict = None) -> dict:
+        """Start the given domain searches on the shared pool, returns domain -> future."""
+        timings = {} if timings is None else timings
+        pool = _search_pool()
+        return {
+            domain: pool.submit(_timed, timings, domain, search,
+                                self._domain_query(domain, query, style_priority), domain,
+                                SEARCH_CONFIG[domain]["max_results"])
+            for domain in domains
+        }
 
-        # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
+    def _multi_domain_search(self, query: str, style_priority: list = None, timings: dict = None) -> dict:
+        """Execute searches across multiple domains concurrently."""
+        futures = self._submit_searches(list(SEARCH_CONFIG), query, style_priority, timings)
+        return {domain: future.result() for domain, future in futures.items()}
 
-        return {}
+    def _find_reasoning_rule(self, category: str) -> dict:
+        """Find matching reasoning rule for a category."""
+        position = self._rule_position(category)
+        return {} if position is None else self.reasoning_data[position]
 
     def _apply_reasoning(self, category: str, search_results: dict) -> dict:
         """Apply reasoning rules to search results."""
-        rule = self._find_reasoning_rule(category)
+        position = self._rule_position(category)
 
-        if not rule:
+        if position is None:
             return {
                 "pattern": "Hero + Features + CTA",
                 "style_priority": ["Minimalism", "Flat Design"],
@@ -101,23 +185,11 @@ class DesignSystemGenerator:
                 "severity": "MEDIUM"
             }
 
-        # Parse decision rules JSON
-        decision_rules = {}
-        try:
-            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
-        except json.JSONDecodeError:
-            pass
-
-        return {
-            "pattern": rule.get("Recommended_Pattern", ""),
-            "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
-            "color_mood": rule.get("Color_Mood", ""),
-            "typography_mood": rule.get("Typography_Mood", ""),
-            "key_effects": rule.get("Key_Effects", ""),
-            "anti_patterns": rule.get("Anti_Patterns", ""),
-            "decision_rules": decision_rules,
-            "severity": rule.get("Severity", "MEDIUM")
-        }
+        # Copy the mutable parts so callers can't alter the precomputed rule
+        reasoning = dict(self._rule_reasoning[position])
+        reasoning["style_priority"] = list(reasoning["style_priority"])
+        reasoning["decision_rules"] = dict(reasoning["decision_rules"])
+        return reasoning
 
     def _select_best_match(self, results: list, priority_keywords: list) -> dict:
         """Select best matching result based on priority keywords."""
@@ -162,20 +234,29 @@ class DesignSystemGenerator:
 
     def generate(self, query: str, project_name: str = None) -> dict:
         """Generate complete design system recommendation."""
-        # Step 1: First search product to get category
-        product_result = search(query, "product", 1)
+        timings = {}
+        started = time.perf_counter()
+
+        # Step 1: Product search (to get category) runs first in the pipeline; domains
+        # that don't depend on the category are searched concurrently alongside it
+        product_future = self._submit_searches(["product"], query, timings=timings)["product"]
+        independent = [d for d in SEARCH_CONFIG if d not in ("product", "style")]
+        futures = self._submit_searches(independent, query, timings=timings)
+
+        product_result = product_future.result()
         product_results = product_result.get("results", [])
         category = "General"
         if product_results:
             category = product_results[0].get("Product Type", "General")
 
         # Step 2: Get reasoning rules for this category
-        reasoning = self._apply_reasoning(category, {})
+        reasoning = _timed(timings, "reasoning", self._apply_reasoning, category, {})
         style_priority = reasoning.get("style_priority", [])
 
-        # Step 3: Multi-domain search with style priority hints
-        search_results = self._multi_domain_search(query, style_priority)
-        search_results["product"] = product_result  # Reuse product search
+        # Step 3: Style search needs the priority hints, so it starts last
+        futures.update(self._submit_searches(["style"], query, style_priority, timings))
+        search_results = {domain: future.result() for domain, future in futures.items()}
+        search_results["product"] = product_result
 
         # Step 4: Select best matches from each domain using priority
         style_results = self._extract_results(search_results.get("style", {}))
@@ -193,6 +274,7 @@ class DesignSystemGenerator:
         style_effects = best_style.get("Effects & Animation", "")
         reasoning_effects = reasoning.get("key_effects", "")
         combined_effects = style_effects if style_effects else reasoning_effects
+        timings["total"] = round((time.perf_counter() - started) * 1000, 3)
 
         return {
             "project_name": project_name or query.upper(),
@@ -232,155 +314,200 @@ class DesignSystemGenerator:
             "key_effects": combined_effects,
             "anti_patterns": reasoning.get("anti_patterns", ""),
             "decision_rules": reasoning.get("decision_rules", {}),
-            "severity": reasoning.get("severity", "MEDIUM")
+            "severity": reasoning.get("severity", "MEDIUM"),
+            "timings": timings
         }
 
 
 # ============ OUTPUT FORMATTERS ============
 BOX_WIDTH = 90  # Wider box for more content
+SECTION_CACHE_SIZE = 512
 
-def format_ascii_box(design_system: dict) -> str:
-    """Format design system as ASCII box with emojis (MCP-style)."""
-    project = design_system.get("project_name", "PROJECT")
-    pattern = design_system.get("pattern", {})
-    style = design_system.get("style", {})
-    colors = design_system.get("colors", {})
-    typography = design_system.get("typography", {})
-    effects = design_system.get("key_effects", "")
-    anti_patterns = design_system.get("anti_patterns", "")
+# Every formatter is a "\n".join of section fragments. A fragment that depends
+# on one slice of the design system (colors, typography, ...) is cached on that
+# slice, and static text is joined once at import. Re-rendering after a small
+# change, or rendering many projects that share a palette or style, only
+# rebuilds the sections that actually differ.
 
-    def wrap_text(text: str, prefix: str, width: int) -> list:
-        """Wrap long text into multiple lines."""
-        if not text:
-            return []
-        words = text.split()
-        lines = []
-        current_line = prefix
-        for word in words:
-            if len(current_line) + len(word) + 1 <= width - 2:
-                current_line += (" " if current_line != prefix else "") + word
-            else:
-                if current_line != prefix:
-                    lines.append(current_line)
-                current_line = prefix + word
-        if current_line != prefix:
-            lines.append(current_line)
-        return lines
-
-    # Build sections from pattern
-    sections = pattern.get("sections", "").split(">")
-    sections = [s.strip() for s in sections if s.strip()]
 
-    # Build output lines
+def _freeze(part):
+    """Hashable form of nested section input: dicts become item tuples, lists tuples."""
+    if isinstance(part, dict):
+        return tuple((key, _freeze(value)) for key, value in part.items())
+    if isinstance(part, list):
+        return tuple(_freeze(value) for value in part)
+    return part
+
+
+def _render(section, part, *extra) -> str:
+    """Render a cached section fragment from the slice of the design system it uses."""
+    if isinstance(part, dict):
+        part = tuple(part.items())
+    try:
+        return section(part, *extra)
+    except TypeError:  # unhashable value: render without caching
+        return section.__wrapped__(part, *extra)
+
+
+def _box(text: str) -> str:
+    return text.ljust(BOX_WIDTH) + "|"
+
+
+def _wrap_text(text: str, prefix: str, width: int) -> list:
+    """Wrap long text into multiple lines."""
+    if not text:
+        return []
+    words = text.split()
     lines = []
-    w = BOX_WIDTH - 1
+    current_line = prefix
+    for word in words:
+        if len(current_line) + len(word) + 1 <= width - 2:
+            current_line += (" " if current_line != prefix else "") + word
+        else:
+            if current_line != prefix:
+                lines.append(current_line)
+            current_line = prefix + word
+    if current_line != prefix:
+        lines.append(current_line)
+    return lines
 
-    lines.append("+" + "-" * w + "+")
-    lines.append(f"|  TARGET: {project} - RECOMMENDED DESIGN SYSTEM".ljust(BOX_WIDTH) + "|")
-    lines.append("+" + "-" * w + "+")
-    lines.append("|" + " " * BOX_WIDTH + "|")
 
-    # Pattern section
-    lines.append(f"|  PATTERN: {pattern.get('name', '')}".ljust(BOX_WIDTH) + "|")
+def _box_wrapped(text: str) -> list:
+    return [_box(line) for line in _wrap_text(text, "|     ", BOX_WIDTH)]
+
+
+_BOX_RULE = "+" + "-" * (BOX_WIDTH - 1) + "+"
+_BOX_BLANK = "|" + " " * BOX_WIDTH + "|"
+
+_BOX_CHECKLIST = "\n".join(
+    [_box("|  PRE-DELIVERY CHECKLIST:")]
+    + [_box(f"|     {item}") for item in (
+        "[ ] No emojis as icons (use SVG: Heroicons/Lucide)",
+        "[ ] cursor-pointer on all clickable elements",
+        "[ ] Hover states with smooth transitions (150-300ms)",
+        "[ ] Light mode: text contrast 4.5:1 minimum",
+        "[ ] Focus states visible for keyboard nav",
+        "[ ] prefers-reduced-motion respected",
+        "[ ] Responsive: 375px, 768px, 1024px, 1440px"
+    )]
+    + [_BOX_BLANK, _BOX_RULE]
+)
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _ascii_pattern(pattern) -> str:
+    pattern = dict(pattern)
+    sections = pattern.get("sections", "").split(">")
+    sections = [s.strip() for s in sections if s.strip()]
+
+    lines = [_box(f"|  PATTERN: {pattern.get('name', '')}")]
     if pattern.get('conversion'):
-        lines.append(f"|     Conversion: {pattern.get('conversion', '')}".ljust(BOX_WIDTH) + "|")
+        lines.append(_box(f"|     Conversion: {pattern.get('conversion', '')}"))
     if pattern.get('cta_placement'):
-        lines.append(f"|     CTA: {pattern.get('cta_placement', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append("|     Sections:".ljust(BOX_WIDTH) + "|")
+        lines.append(_box(f"|     CTA: {pattern.get('cta_placement', '')}"))
+    lines.append(_box("|     Sections:"))
     for i, section in enumerate(sections, 1):
-        lines.append(f"|       {i}. {section}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+        lines.append(_box(f"|       {i}. {section}"))
+    lines.append(_BOX_BLANK)
+    return "\n".join(lines)
+
 
-    # Style section
-    lines.append(f"|  STYLE: {style.get('name', '')}".ljust(BOX_WIDTH) + "|")
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _ascii_style(style) -> str:
+    style = dict(style)
+    lines = [_box(f"|  STYLE: {style.get('name', '')}")]
     if style.get("keywords"):
-        for line in wrap_text(f"Keywords: {style.get('keywords', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        lines += _box_wrapped(f"Keywords: {style.get('keywords', '')}")
     if style.get("best_for"):
-        for line in wrap_text(f"Best For: {style.get('best_for', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        lines += _box_wrapped(f"Best For: {style.get('best_for', '')}")
     if style.get("performance") or style.get("accessibility"):
         perf_a11y = f"Performance: {style.get('performance', '')} | Accessibility: {style.get('accessibility', '')}"
-        lines.append(f"|     {perf_a11y}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Colors section
-    lines.append("|  COLORS:".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Primary:    {colors.get('primary', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Secondary:  {colors.get('secondary', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     CTA:        {colors.get('cta', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Background: {colors.get('background', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Text:       {colors.get('text', '')}".ljust(BOX_WIDTH) + "|")
+        lines.append(_box(f"|     {perf_a11y}"))
+    lines.append(_BOX_BLANK)
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _ascii_colors(colors) -> str:
+    colors = dict(colors)
+    lines = [
+        _box("|  COLORS:"),
+        _box(f"|     Primary:    {colors.get('primary', '')}"),
+        _box(f"|     Secondary:  {colors.get('secondary', '')}"),
+        _box(f"|     CTA:        {colors.get('cta', '')}"),
+        _box(f"|     Background: {colors.get('background', '')}"),
+        _box(f"|     Text:       {colors.get('text', '')}"),
+    ]
     if colors.get("notes"):
-        for line in wrap_text(f"Notes: {colors.get('notes', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+        lines += _box_wrapped(f"Notes: {colors.get('notes', '')}")
+    lines.append(_BOX_BLANK)
+    return "\n".join(lines)
 
-    # Typography section
-    lines.append(f"|  TYPOGRAPHY: {typography.get('heading', '')} / {typography.get('body', '')}".ljust(BOX_WIDTH) + "|")
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _ascii_typography(typography) -> str:
+    typography = dict(typography)
+    lines = [_box(f"|  TYPOGRAPHY: {typography.get('heading', '')} / {typography.get('body', '')}")]
     if typography.get("mood"):
-        for line in wrap_text(f"Mood: {typography.get('mood', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        lines += _box_wrapped(f"Mood: {typography.get('mood', '')}")
     if typography.get("best_for"):
-        for line in wrap_text(f"Best For: {typography.get('best_for', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        lines += _box_wrapped(f"Best For: {typography.get('best_for', '')}")
     if typography.get("google_fonts_url"):
-        lines.append(f"|     Google Fonts: {typography.get('google_fonts_url', '')}".ljust(BOX_WIDTH) + "|")
+        lines.append(_box(f"|     Google Fonts: {typography.get('google_fonts_url', '')}"))
     if typography.get("css_import"):
-        lines.append(f"|     CSS Import: {typography.get('css_import', '')[:70]}...".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Key Effects section
-    if effects:
-        lines.append("|  KEY EFFECTS:".ljust(BOX_WIDTH) + "|")
-        for line in wrap_text(effects, "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-        lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Anti-patterns section
-    if anti_patterns:
-        lines.append("|  AVOID (Anti-patterns):".ljust(BOX_WIDTH) + "|")
-        for line in wrap_text(anti_patterns, "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-        lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Pre-Delivery Checklist section
-    lines.append("|  PRE-DELIVERY CHECKLIST:".ljust(BOX_WIDTH) + "|")
-    checklist_items = [
-        "[ ] No emojis as icons (use SVG: Heroicons/Lucide)",
-        "[ ] cursor-pointer on all clickable elements",
-        "[ ] Hover states with smooth transitions (150-300ms)",
-        "[ ] Light mode: text contrast 4.5:1 minimum",
-        "[ ] Focus states visible for keyboard nav",
-        "[ ] prefers-reduced-motion respected",
-        "[ ] Responsive: 375px, 768px, 1024px, 1440px"
-    ]
-    for item in checklist_items:
-        lines.append(f"|     {item}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+        lines.append(_box(f"|     CSS Import: {typography.get('css_import', '')[:70]}..."))
+    lines.append(_BOX_BLANK)
+    return "\n".join(lines)
 
-    lines.append("+" + "-" * w + "+")
 
-    return "\n".join(lines)
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _ascii_block(text: str, title: str) -> str:
+    """Titled free-text section (key effects, anti-patterns)."""
+    return "\n".join([_box(title)] + _box_wrapped(text) + [_BOX_BLANK])
 
 
-def format_markdown(design_system: dict) -> str:
-    """Format design system as markdown."""
+def format_ascii_box(design_system: dict) -> str:
+    """Format design system as ASCII box with emojis (MCP-style)."""
     project = design_system.get("project_name", "PROJECT")
-    pattern = design_system.get("pattern", {})
-    style = design_system.get("style", {})
-    colors = design_system.get("colors", {})
-    typography = design_system.get("typography", {})
     effects = design_system.get("key_effects", "")
     anti_patterns = design_system.get("anti_patterns", "")
 
-    lines = []
-    lines.append(f"## Design System: {project}")
-    lines.append("")
+    fragments = [
+        _BOX_RULE,
+        _box(f"|  TARGET: {project} - RECOMMENDED DESIGN SYSTEM"),
+        _BOX_RULE,
+        _BOX_BLANK,
+        _render(_ascii_pattern, design_system.get("pattern", {})),
+        _render(_ascii_style, design_system.get("style", {})),
+        _render(_ascii_colors, design_system.get("colors", {})),
+        _render(_ascii_typography, design_system.get("typography", {})),
+    ]
+    if effects:
+        fragments.append(_render(_ascii_block, effects, "|  KEY EFFECTS:"))
+    if anti_patterns:
+        fragments.append(_render(_ascii_block, anti_patterns, "|  AVOID (Anti-patterns):"))
+    fragments.append(_BOX_CHECKLIST)
+
+    return "\n".join(fragments)
 
-    # Pattern section
-    lines.append("### Pattern")
-    lines.append(f"- **Name:** {pattern.get('name', '')}")
+
+_MD_CHECKLIST = "\n".join([
+    "### Pre-Delivery Checklist",
+    "- [ ] No emojis as icons (use SVG: Heroicons/Lucide)",
+    "- [ ] cursor-pointer on all clickable elements",
+    "- [ ] Hover states with smooth transitions (150-300ms)",
+    "- [ ] Light mode: text contrast 4.5:1 minimum",
+    "- [ ] Focus states visible for keyboard nav",
+    "- [ ] prefers-reduced-motion respected",
+    "- [ ] Responsive: 375px, 768px, 1024px, 1440px",
+    ""
+])
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _md_pattern(pattern) -> str:
+    pattern = dict(pattern)
+    lines = ["### Pattern", f"- **Name:** {pattern.get('name', '')}"]
     if pattern.get('conversion'):
         lines.append(f"- **Conversion Focus:** {pattern.get('conversion', '')}")
     if pattern.get('cta_placement'):
@@ -389,10 +516,13 @@ def format_markdown(design_system: dict) -> str:
         lines.append(f"- **Color Strategy:** {pattern.get('color_strategy', '')}")
     lines.append(f"- **Sections:** {pattern.get('sections', '')}")
     lines.append("")
+    return "\n".join(lines)
+
 
-    # Style section
-    lines.append("### Style")
-    lines.append(f"- **Name:** {style.get('name', '')}")
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _md_style(style) -> str:
+    style = dict(style)
+    lines = ["### Style", f"- **Name:** {style.get('name', '')}"]
     if style.get('keywords'):
         lines.append(f"- **Keywords:** {style.get('keywords', '')}")
     if style.get('best_for'):
@@ -400,24 +530,36 @@ def format_markdown(design_system: dict) -> str:
     if style.get('performance') or style.get('accessibility'):
         lines.append(f"- **Performance:** {style.get('performance', '')} | **Accessibility:** {style.get('accessibility', '')}")
     lines.append("")
+    return "\n".join(lines)
+
 
-    # Colors section
-    lines.append("### Colors")
-    lines.append(f"| Role | Hex |")
-    lines.append(f"|------|-----|")
-    lines.append(f"| Primary | {colors.get('primary', '')} |")
-    lines.append(f"| Secondary | {colors.get('secondary', '')} |")
-    lines.append(f"| CTA | {colors.get('cta', '')} |")
-    lines.append(f"| Background | {colors.get('background', '')} |")
-    lines.append(f"| Text | {colors.get('text', '')} |")
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _md_colors(colors) -> str:
+    colors = dict(colors)
+    lines = [
+        "### Colors",
+        "| Role | Hex |",
+        "|------|-----|",
+        f"| Primary | {colors.get('primary', '')} |",
+        f"| Secondary | {colors.get('secondary', '')} |",
+        f"| CTA | {colors.get('cta', '')} |",
+        f"| Background | {colors.get('background', '')} |",
+        f"| Text | {colors.get('text', '')} |",
+    ]
     if colors.get("notes"):
         lines.append(f"\n*Notes: {colors.get('notes', '')}*")
     lines.append("")
+    return "\n".join(lines)
 
-    # Typography section
-    lines.append("### Typography")
-    lines.append(f"- **Heading:** {typography.get('heading', '')}")
-    lines.append(f"- **Body:** {typography.get('body', '')}")
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _md_typography(typography) -> str:
+    typography = dict(typography)
+    lines = [
+        "### Typography",
+        f"- **Heading:** {typography.get('heading', '')}",
+        f"- **Body:** {typography.get('body', '')}",
+    ]
     if typography.get("mood"):
         lines.append(f"- **Mood:** {typography.get('mood', '')}")
     if typography.get("best_for"):
@@ -425,42 +567,38 @@ def format_markdown(design_system: dict) -> str:
     if typography.get("google_fonts_url"):
         lines.append(f"- **Google Fonts:** {typography.get('google_fonts_url', '')}")
     if typography.get("css_import"):
-        lines.append(f"- **CSS Import:**")
-        lines.append(f"```css")
-        lines.append(f"{typography.get('css_import', '')}")
-        lines.append(f"```")
+        lines += ["- **CSS Import:**", "```css", f"{typography.get('css_import', '')}", "```"]
     lines.append("")
+    return "\n".join(lines)
 
-    # Key Effects section
-    if effects:
-        lines.append("### Key Effects")
-        lines.append(f"{effects}")
-        lines.append("")
 
-    # Anti-patterns section
+def format_markdown(design_system: dict) -> str:
+    """Format design system as markdown."""
+    project = design_system.get("project_name", "PROJECT")
+    effects = design_system.get("key_effects", "")
+    anti_patterns = design_system.get("anti_patterns", "")
+
+    fragments = [
+        f"## Design System: {project}\n",
+        _render(_md_pattern, design_system.get("pattern", {})),
+        _render(_md_style, design_system.get("style", {})),
+        _render(_md_colors, design_system.get("colors", {})),
+        _render(_md_typography, design_system.get("typography", {})),
+    ]
+    if effects:
+        fragments.append(f"### Key Effects\n{effects}\n")
     if anti_patterns:
-        lines.append("### Avoid (Anti-patterns)")
         newline_bullet = '\n- '
-        lines.append(f"- {anti_patterns.replace(' + ', newline_bullet)}")
-        lines.append("")
+        fragments.append(f"### Avoid (Anti-patterns)\n- {anti_patterns.replace(' + ', newline_bullet)}\n")
+    fragments.append(_MD_CHECKLIST)
 
-    # Pre-Delivery Checklist section
-    lines.append("### Pre-Delivery Checklist")
-    lines.append("- [ ] No emojis as icons (use SVG: Heroicons/Lucide)")
-    lines.append("- [ ] cursor-pointer on all clickable elements")
-    lines.append("- [ ] Hover states with smooth transitions (150-300ms)")
-    lines.append("- [ ] Light mode: text contrast 4.5:1 minimum")
-    lines.append("- [ ] Focus states visible for keyboard nav")
-    lines.append("- [ ] prefers-reduced-motion respected")
-    lines.append("- [ ] Responsive: 375px, 768px, 1024px, 1440px")
-    lines.append("")
-
-    return "\n".join(lines)
+    return "\n".join(fragments)
 
 
 # ============ MAIN ENTRY POINT ============
 def generate_design_system(query: str, project_name: str = None, output_format: str = "ascii", 
-                           persist: bool = False, page: str = None, output_dir: str = None) -> str:
+                           persist: bool = False, page: str = None, output_dir: str = None,
+                           pages: list = None) -> str:
     """
     Main entry point for design system generation.
 
@@ -471,6 +609,7 @@ def generate_design_system(query: str, project_name: str = None, output_format:
         persist: If True, save design system to design-system/ folder
         page: Optional page name for page-specific override file
         output_dir: Optional output directory (defaults to current working directory)
+        pages: Optional further page names to persist override files for
 
     Returns:
         Formatted design system string
@@ -480,26 +619,163 @@ def generate_design_system(query: str, project_name: str = None, output_format:
     
     # Persist to files if requested
     if persist:
-        persist_design_system(design_system, page, output_dir, query)
+        persist_design_system(design_system, page, output_dir, query, pages)
 
     if output_format == "markdown":
         return format_markdown(design_system)
     return format_ascii_box(design_system)
 
 
+# ============ BATCH GENERATION ============
+# Worker processes each hold one generator, so reasoning rules and search
+# indexes are loaded once per process and shared by every job it runs.
+_BATCH_GENERATOR = None
+
+
+def _batch_worker_init():
+    global _BATCH_GENERATOR
+    _BATCH_GENERATOR = DesignSystemGenerator()
+
+
+def _batch_generate(query: str) -> dict:
+    return _BATCH_GENERATOR.generate(query)
+
+
+def generate_design_systems(jobs, output_format: str = "ascii", persist: bool = False,
+                            output_dir: str = None, workers: int = None):
+    """
+    Generate design systems for many projects, yielding results as each one completes.
+
+    Args:
+        jobs: Query strings or dicts with "query" and optional "project_name",
+              "page", "pages", "persist" and "output_dir" (overriding the batch defaults)
+        output_format: "ascii" (default) or "markdown"
+        persist: Default for jobs that don't set "persist"
+        output_dir: Default for jobs that don't set "output_dir"
+        workers: Worker processes (default: one per CPU, capped at the number
+                 of distinct queries); 1 runs everything in this process
+
+    Yields:
+        (position, job, formatted output) in completion order, where position
+        is the job's index in the input
+    """
+    jobs = [{"query": job} if isinstance(job, str) else dict(job) for job in jobs]
+
+    # Queries with the same tokens run identical searches: generate each once
+    groups = {}
+    for position, job in enumerate(jobs):
+        groups.setdefault(tuple(tokenize(job["query"])), []).append(position)
+
+    def finish(design_system: dict, positions: list):
+        for position in positions:
+            job = jobs[position]
+            result = dict(design_system, project_name=job.get("project_name") or job["query"].upper())
+            if job.get("persist", persist):
+                persist_design_system(result, job.get("page"), job.get("output_dir", output_dir), job["query"],
+                                      job.get("pages"))
+            output = format_markdown(result) if output_format == "markdown" else format_ascii_box(result)
+            yield position, job, output
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(groups))
+
+    if workers <= 1:
+        generator = DesignSystemGenerator()
+        for positions in groups.values():
+            yield from finish(generator.generate(jobs[positions[0]]["query"]), positions)
+        return
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    build_indexes()  # workers then only load the on-disk indexes
+    # spawn: forking a process that already runs search threads is unsafe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_batch_worker_init) as pool:
+        futures = {pool.submit(_batch_generate, jobs[positions[0]]["query"]): positions
+                   for positions in groups.values()}
+        for future in as_completed(futures):
+            yield from finish(future.result(), futures[future])
+
+
 # ============ PERSISTENCE FUNCTIONS ============
-def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None) -> dict:
+# The only line that changes between otherwise identical renders
+_GENERATED_LINE = re.compile(r"^(?:> )?\*\*Generated:\*\* .*$", re.MULTILINE)
+
+
+def _content_hash(content: str) -> str:
+    """Hash of a rendered file, ignoring its Generated timestamp."""
+    import hashlib
+    return hashlib.sha256(_GENERATED_LINE.sub("", content).encode("utf-8")).hexdigest()
+
+
+def _write_if_changed(path: Path, content: str) -> bool:
+    """
+    Atomically replace path with content unless only the timestamp would change.
+
+    The new content goes to a temp file in the same directory, is fsynced and
+    then renamed over the target, so readers and file watchers only ever see
+    a complete file. Returns True if the file was written.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if _content_hash(f.read()) == _content_hash(content):
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass  # missing or unreadable: write it
+
+    # Unique per process and thread: the daemon persists on concurrent request threads.
+    # (Not mkstemp, which would create the file 0600 instead of honouring the umask.)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+    return True
+
+
+def _sync_directory(directory: Path):
+    """fsync a directory so completed renames survive a crash (no-op where unsupported)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def persist_design_system(design_system: dict, page: str = None, output_dir: str = None,
+                          page_query: str = None, pages: list = None) -> dict:
     """
     Persist design system to design-system/<project>/ folder using Master + Overrides pattern.
+
+    Files are written atomically, and files whose content is unchanged apart
+    from the Generated timestamp are left untouched.
     
     Args:
         design_system: The generated design system dictionary
         page: Optional page name for page-specific override file
         output_dir: Optional output directory (defaults to current working directory)
         page_query: Optional query string for intelligent page override generation
+        pages: Optional further page names, all written in this one call
     
     Returns:
-        dict with created file paths and status
+        dict with status, written ("created_files") and skipped ("unchanged_files") paths
     """
     base_dir = Path(output_dir) if output_dir else Path.cwd()
     
@@ -511,294 +787,351 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     pages_dir = design_system_dir / "pages"
     
     created_files = []
+    unchanged_files = []
     
     # Create directories
     design_system_dir.mkdir(parents=True, exist_ok=True)
     pages_dir.mkdir(parents=True, exist_ok=True)
     
-    master_file = design_system_dir / "MASTER.md"
-    
-    # Generate and write MASTER.md
-    master_content = format_master_md(design_system)
-    with open(master_file, 'w', encoding='utf-8') as f:
-        f.write(master_content)
-    created_files.append(str(master_file))
-    
-    # If page is specified, create page override file with intelligent content
-    if page:
-        page_file = pages_dir / f"{page.lower().replace(' ', '-')}.md"
-        page_content = format_page_override_md(design_system, page, page_query)
-        with open(page_file, 'w', encoding='utf-8') as f:
-            f.write(page_content)
-        created_files.append(str(page_file))
+    # MASTER.md, then one intelligent override file per requested page
+    targets = [(design_system_dir / "MASTER.md", lambda: format_master_md(design_system))]
+    for name in dict.fromkeys(([page] if page else []) + list(pages or [])):
+        page_file = pages_dir / f"{name.lower().replace(' ', '-')}.md"
+        targets.append((page_file, lambda name=name: format_page_override_md(design_system, name, page_query)))
+
+    for path, render in targets:
+        if _write_if_changed(path, render()):
+            created_files.append(str(path))
+        else:
+            unchanged_files.append(str(path))
+
+    # One sync per directory that received a rename
+    for directory in dict.fromkeys(Path(path).parent for path in created_files):
+        _sync_directory(directory)
     
     return {
         "status": "success",
         "design_system_dir": str(design_system_dir),
-        "created_files": created_files
+        "created_files": created_files,
+        "unchanged_files": unchanged_files
     }
 
 
-def format_master_md(design_system: dict) -> str:
-    """Format design system as MASTER.md with hierarchical override logic."""
-    project = design_system.get("project_name", "PROJECT")
-    pattern = design_system.get("pattern", {})
-    style = design_system.get("style", {})
-    colors = design_system.get("colors", {})
-    typography = design_system.get("typography", {})
-    effects = design_system.get("key_effects", "")
-    anti_patterns = design_system.get("anti_patterns", "")
-    
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    lines = []
-    
-    # Logic header
-    lines.append("# Design System Master File")
-    lines.append("")
-    lines.append("> **LOGIC:** When building a specific page, first check `design-system/pages/[page-name].md`.")
-    lines.append("> If that file exists, its rules **override** this Master file.")
-    lines.append("> If not, strictly follow the rules below.")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    lines.append(f"**Project:** {project}")
-    lines.append(f"**Generated:** {timestamp}")
-    lines.append(f"**Category:** {design_system.get('category', 'General')}")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    
-    # Global Rules section
-    lines.append("## Global Rules")
-    lines.append("")
-    
-    # Color Palette
-    lines.append("### Color Palette")
-    lines.append("")
-    lines.append("| Role | Hex | CSS Variable |")
-    lines.append("|------|-----|--------------|")
-    lines.append(f"| Primary | `{colors.get('primary', '#2563EB')}` | `--color-primary` |")
-    lines.append(f"| Secondary | `{colors.get('secondary', '#3B82F6')}` | `--color-secondary` |")
-    lines.append(f"| CTA/Accent | `{colors.get('cta', '#F97316')}` | `--color-cta` |")
-    lines.append(f"| Background | `{colors.get('background', '#F8FAFC')}` | `--color-background` |")
-    lines.append(f"| Text | `{colors.get('text', '#1E293B')}` | `--color-text` |")
-    lines.append("")
+_MASTER_INTRO = "\n".join([
+    "# Design System Master File",
+    "",
+    "> **LOGIC:** When building a specific page, first check `design-system/pages/[page-name].md`.",
+    "> If that file exists, its rules **override** this Master file.",
+    "> If not, strictly follow the rules below.",
+    "",
+    "---",
+    "",
+])
+
+_MASTER_TOKENS = "\n".join([
+    # Spacing Variables
+    "### Spacing Variables",
+    "",
+    "| Token | Value | Usage |",
+    "|-------|-------|-------|",
+    "| `--space-xs` | `4px` / `0.25rem` | Tight gaps |",
+    "| `--space-sm` | `8px` / `0.5rem` | Icon gaps, inline spacing |",
+    "| `--space-md` | `16px` / `1rem` | Standard padding |",
+    "| `--space-lg` | `24px` / `1.5rem` | Section padding |",
+    "| `--space-xl` | `32px` / `2rem` | Large gaps |",
+    "| `--space-2xl` | `48px` / `3rem` | Section margins |",
+    "| `--space-3xl` | `64px` / `4rem` | Hero padding |",
+    "",
+    # Shadow Depths
+    "### Shadow Depths",
+    "",
+    "| Level | Value | Usage |",
+    "|-------|-------|-------|",
+    "| `--shadow-sm` | `0 1px 2px rgba(0,0,0,0.05)` | Subtle lift |",
+    "| `--shadow-md` | `0 4px 6px rgba(0,0,0,0.1)` | Cards, buttons |",
+    "| `--shadow-lg` | `0 10px 15px rgba(0,0,0,0.1)` | Modals, dropdowns |",
+    "| `--shadow-xl` | `0 20px 25px rgba(0,0,0,0.15)` | Hero images, featured cards |",
+    "",
+    # Component Specs section
+    "---",
+    "",
+    "## Component Specs",
+    "",
+])
+
+_MASTER_MODALS = "\n".join([
+    "### Modals",
+    "",
+    "```css",
+    ".modal-overlay {",
+    "  background: rgba(0, 0, 0, 0.5);",
+    "  backdrop-filter: blur(4px);",
+    "}",
+    "",
+    ".modal {",
+    "  background: white;",
+    "  border-radius: 16px;",
+    "  padding: 32px;",
+    "  box-shadow: var(--shadow-xl);",
+    "  max-width: 500px;",
+    "  width: 90%;",
+    "}",
+    "```",
+    "",
+])
+
+_MASTER_FOOTER = "\n".join([
+    "### Additional Forbidden Patterns",
+    "",
+    "- ❌ **Emojis as icons** — Use SVG icons (Heroicons, Lucide, Simple Icons)",
+    "- ❌ **Missing cursor:pointer** — All clickable elements must have cursor:pointer",
+    "- ❌ **Layout-shifting hovers** — Avoid scale transforms that shift layout",
+    "- ❌ **Low contrast text** — Maintain 4.5:1 minimum contrast ratio",
+    "- ❌ **Instant state changes** — Always use transitions (150-300ms)",
+    "- ❌ **Invisible focus states** — Focus states must be visible for a11y",
+    "",
+    # Pre-Delivery Checklist
+    "---",
+    "",
+    "## Pre-Delivery Checklist",
+    "",
+    "Before delivering any UI code, verify:",
+    "",
+    "- [ ] No emojis used as icons (use SVG instead)",
+    "- [ ] All icons from consistent icon set (Heroicons/Lucide)",
+    "- [ ] `cursor-pointer` on all clickable elements",
+    "- [ ] Hover states with smooth transitions (150-300ms)",
+    "- [ ] Light mode: text contrast 4.5:1 minimum",
+    "- [ ] Focus states visible for keyboard navigation",
+    "- [ ] `prefers-reduced-motion` respected",
+    "- [ ] Responsive: 375px, 768px, 1024px, 1440px",
+    "- [ ] No content hidden behind fixed navbars",
+    "- [ ] No horizontal scroll on mobile",
+    "",
+])
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _master_palette(colors) -> str:
+    colors = dict(colors)
+    lines = [
+        "### Color Palette",
+        "",
+        "| Role | Hex | CSS Variable |",
+        "|------|-----|--------------|",
+        f"| Primary | `{colors.get('primary', '#2563EB')}` | `--color-primary` |",
+        f"| Secondary | `{colors.get('secondary', '#3B82F6')}` | `--color-secondary` |",
+        f"| CTA/Accent | `{colors.get('cta', '#F97316')}` | `--color-cta` |",
+        f"| Background | `{colors.get('background', '#F8FAFC')}` | `--color-background` |",
+        f"| Text | `{colors.get('text', '#1E293B')}` | `--color-text` |",
+        "",
+    ]
     if colors.get("notes"):
-        lines.append(f"**Color Notes:** {colors.get('notes', '')}")
-        lines.append("")
-    
-    # Typography
-    lines.append("### Typography")
-    lines.append("")
-    lines.append(f"- **Heading Font:** {typography.get('heading', 'Inter')}")
-    lines.append(f"- **Body Font:** {typography.get('body', 'Inter')}")
+        lines += [f"**Color Notes:** {colors.get('notes', '')}", ""]
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _master_typography(typography) -> str:
+    typography = dict(typography)
+    lines = [
+        "### Typography",
+        "",
+        f"- **Heading Font:** {typography.get('heading', 'Inter')}",
+        f"- **Body Font:** {typography.get('body', 'Inter')}",
+    ]
     if typography.get("mood"):
         lines.append(f"- **Mood:** {typography.get('mood', '')}")
     if typography.get("google_fonts_url"):
         lines.append(f"- **Google Fonts:** [{typography.get('heading', '')} + {typography.get('body', '')}]({typography.get('google_fonts_url', '')})")
     lines.append("")
     if typography.get("css_import"):
-        lines.append("**CSS Import:**")
-        lines.append("```css")
-        lines.append(typography.get("css_import", ""))
-        lines.append("```")
-        lines.append("")
-    
-    # Spacing Variables
-    lines.append("### Spacing Variables")
-    lines.append("")
-    lines.append("| Token | Value | Usage |")
-    lines.append("|-------|-------|-------|")
-    lines.append("| `--space-xs` | `4px` / `0.25rem` | Tight gaps |")
-    lines.append("| `--space-sm` | `8px` / `0.5rem` | Icon gaps, inline spacing |")
-    lines.append("| `--space-md` | `16px` / `1rem` | Standard padding |")
-    lines.append("| `--space-lg` | `24px` / `1.5rem` | Section padding |")
-    lines.append("| `--space-xl` | `32px` / `2rem` | Large gaps |")
-    lines.append("| `--space-2xl` | `48px` / `3rem` | Section margins |")
-    lines.append("| `--space-3xl` | `64px` / `4rem` | Hero padding |")
-    lines.append("")
-    
-    # Shadow Depths
-    lines.append("### Shadow Depths")
-    lines.append("")
-    lines.append("| Level | Value | Usage |")
-    lines.append("|-------|-------|-------|")
-    lines.append("| `--shadow-sm` | `0 1px 2px rgba(0,0,0,0.05)` | Subtle lift |")
-    lines.append("| `--shadow-md` | `0 4px 6px rgba(0,0,0,0.1)` | Cards, buttons |")
-    lines.append("| `--shadow-lg` | `0 10px 15px rgba(0,0,0,0.1)` | Modals, dropdowns |")
-    lines.append("| `--shadow-xl` | `0 20px 25px rgba(0,0,0,0.15)` | Hero images, featured cards |")
-    lines.append("")
-    
-    # Component Specs section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Component Specs")
-    lines.append("")
-    
-    # Buttons
-    lines.append("### Buttons")
-    lines.append("")
-    lines.append("```css")
-    lines.append("/* Primary Button */")
-    lines.append(".btn-primary {")
-    lines.append(f"  background: {colors.get('cta', '#F97316')};")
-    lines.append("  color: white;")
-    lines.append("  padding: 12px 24px;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-weight: 600;")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".btn-primary:hover {")
-    lines.append("  opacity: 0.9;")
-    lines.append("  transform: translateY(-1px);")
-    lines.append("}")
-    lines.append("")
-    lines.append("/* Secondary Button */")
-    lines.append(".btn-secondary {")
-    lines.append(f"  background: transparent;")
-    lines.append(f"  color: {colors.get('primary', '#2563EB')};")
-    lines.append(f"  border: 2px solid {colors.get('primary', '#2563EB')};")
-    lines.append("  padding: 12px 24px;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-weight: 600;")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Cards
-    lines.append("### Cards")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".card {")
-    lines.append(f"  background: {colors.get('background', '#FFFFFF')};")
-    lines.append("  border-radius: 12px;")
-    lines.append("  padding: 24px;")
-    lines.append("  box-shadow: var(--shadow-md);")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".card:hover {")
-    lines.append("  box-shadow: var(--shadow-lg);")
-    lines.append("  transform: translateY(-2px);")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Inputs
-    lines.append("### Inputs")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".input {")
-    lines.append("  padding: 12px 16px;")
-    lines.append("  border: 1px solid #E2E8F0;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-size: 16px;")
-    lines.append("  transition: border-color 200ms ease;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".input:focus {")
-    lines.append(f"  border-color: {colors.get('primary', '#2563EB')};")
-    lines.append("  outline: none;")
-    lines.append(f"  box-shadow: 0 0 0 3px {colors.get('primary', '#2563EB')}20;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Modals
-    lines.append("### Modals")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".modal-overlay {")
-    lines.append("  background: rgba(0, 0, 0, 0.5);")
-    lines.append("  backdrop-filter: blur(4px);")
-    lines.append("}")
-    lines.append("")
-    lines.append(".modal {")
-    lines.append("  background: white;")
-    lines.append("  border-radius: 16px;")
-    lines.append("  padding: 32px;")
-    lines.append("  box-shadow: var(--shadow-xl);")
-    lines.append("  max-width: 500px;")
-    lines.append("  width: 90%;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Style section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Style Guidelines")
-    lines.append("")
-    lines.append(f"**Style:** {style.get('name', 'Minimalism')}")
-    lines.append("")
+        lines += ["**CSS Import:**", "```css", typography.get("css_import", ""), "```", ""]
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _master_components(colors) -> str:
+    """Buttons, cards and inputs: the component specs that use the palette."""
+    colors = dict(colors)
+    primary = colors.get('primary', '#2563EB')
+    return "\n".join([
+        # Buttons
+        "### Buttons",
+        "",
+        "```css",
+        "/* Primary Button */",
+        ".btn-primary {",
+        f"  background: {colors.get('cta', '#F97316')};",
+        "  color: white;",
+        "  padding: 12px 24px;",
+        "  border-radius: 8px;",
+        "  font-weight: 600;",
+        "  transition: all 200ms ease;",
+        "  cursor: pointer;",
+        "}",
+        "",
+        ".btn-primary:hover {",
+        "  opacity: 0.9;",
+        "  transform: translateY(-1px);",
+        "}",
+        "",
+        "/* Secondary Button */",
+        ".btn-secondary {",
+        "  background: transparent;",
+        f"  color: {primary};",
+        f"  border: 2px solid {primary};",
+        "  padding: 12px 24px;",
+        "  border-radius: 8px;",
+        "  font-weight: 600;",
+        "  transition: all 200ms ease;",
+        "  cursor: pointer;",
+        "}",
+        "```",
+        "",
+        # Cards
+        "### Cards",
+        "",
+        "```css",
+        ".card {",
+        f"  background: {colors.get('background', '#FFFFFF')};",
+        "  border-radius: 12px;",
+        "  padding: 24px;",
+        "  box-shadow: var(--shadow-md);",
+        "  transition: all 200ms ease;",
+        "  cursor: pointer;",
+        "}",
+        "",
+        ".card:hover {",
+        "  box-shadow: var(--shadow-lg);",
+        "  transform: translateY(-2px);",
+        "}",
+        "```",
+        "",
+        # Inputs
+        "### Inputs",
+        "",
+        "```css",
+        ".input {",
+        "  padding: 12px 16px;",
+        "  border: 1px solid #E2E8F0;",
+        "  border-radius: 8px;",
+        "  font-size: 16px;",
+        "  transition: border-color 200ms ease;",
+        "}",
+        "",
+        ".input:focus {",
+        f"  border-color: {primary};",
+        "  outline: none;",
+        f"  box-shadow: 0 0 0 3px {primary}20;",
+        "}",
+        "```",
+        "",
+    ])
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _master_style(style, effects) -> str:
+    style = dict(style)
+    lines = ["---", "", "## Style Guidelines", "", f"**Style:** {style.get('name', 'Minimalism')}", ""]
     if style.get("keywords"):
-        lines.append(f"**Keywords:** {style.get('keywords', '')}")
-        lines.append("")
+        lines += [f"**Keywords:** {style.get('keywords', '')}", ""]
     if style.get("best_for"):
-        lines.append(f"**Best For:** {style.get('best_for', '')}")
-        lines.append("")
+        lines += [f"**Best For:** {style.get('best_for', '')}", ""]
     if effects:
-        lines.append(f"**Key Effects:** {effects}")
-        lines.append("")
-    
-    # Layout Pattern
-    lines.append("### Page Pattern")
-    lines.append("")
-    lines.append(f"**Pattern Name:** {pattern.get('name', '')}")
-    lines.append("")
+        lines += [f"**Key Effects:** {effects}", ""]
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _master_pattern(pattern) -> str:
+    pattern = dict(pattern)
+    lines = ["### Page Pattern", "", f"**Pattern Name:** {pattern.get('name', '')}", ""]
     if pattern.get('conversion'):
         lines.append(f"- **Conversion Strategy:** {pattern.get('conversion', '')}")
     if pattern.get('cta_placement'):
         lines.append(f"- **CTA Placement:** {pattern.get('cta_placement', '')}")
-    lines.append(f"- **Section Order:** {pattern.get('sections', '')}")
-    lines.append("")
-    
-    # Anti-Patterns section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Anti-Patterns (Do NOT Use)")
-    lines.append("")
+    lines += [f"- **Section Order:** {pattern.get('sections', '')}", ""]
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _master_anti_patterns(anti_patterns) -> str:
+    lines = ["---", "", "## Anti-Patterns (Do NOT Use)", ""]
     if anti_patterns:
         anti_list = [a.strip() for a in anti_patterns.split("+")]
-        for anti in anti_list:
-            if anti:
-                lines.append(f"- ❌ {anti}")
-    lines.append("")
-    lines.append("### Additional Forbidden Patterns")
+        lines += [f"- ❌ {anti}" for anti in anti_list if anti]
     lines.append("")
-    lines.append("- ❌ **Emojis as icons** — Use SVG icons (Heroicons, Lucide, Simple Icons)")
-    lines.append("- ❌ **Missing cursor:pointer** — All clickable elements must have cursor:pointer")
-    lines.append("- ❌ **Layout-shifting hovers** — Avoid scale transforms that shift layout")
-    lines.append("- ❌ **Low contrast text** — Maintain 4.5:1 minimum contrast ratio")
-    lines.append("- ❌ **Instant state changes** — Always use transitions (150-300ms)")
-    lines.append("- ❌ **Invisible focus states** — Focus states must be visible for a11y")
-    lines.append("")
-    
-    # Pre-Delivery Checklist
-    lines.append("---")
-    lines.append("")
-    lines.append("## Pre-Delivery Checklist")
+    return "\n".join(lines)
+
+
+def format_master_md(design_system: dict) -> str:
+    """Format design system as MASTER.md with hierarchical override logic."""
+    project = design_system.get("project_name", "PROJECT")
+    colors = design_system.get("colors", {})
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    return "\n".join([
+        _MASTER_INTRO,
+        f"**Project:** {project}",
+        f"**Generated:** {timestamp}",
+        f"**Category:** {design_system.get('category', 'General')}",
+        "\n---\n\n## Global Rules\n",
+        _render(_master_palette, colors),
+        _render(_master_typography, design_system.get("typography", {})),
+        _MASTER_TOKENS,
+        _render(_master_components, colors),
+        _MASTER_MODALS,
+        _render(_master_style, design_system.get("style", {}), design_system.get("key_effects", "")),
+        _render(_master_pattern, design_system.get("pattern", {})),
+        _render(_master_anti_patterns, design_system.get("anti_patterns", "")),
+        _MASTER_FOOTER,
+    ])
+
+
+_OVERRIDE_NOTICE = "\n".join([
+    "> ⚠️ **IMPORTANT:** Rules in this file **override** the Master file (`design-system/MASTER.md`).",
+    "> Only deviations from the Master are documented here. For all other rules, refer to the Master.",
+    "",
+    "---",
+    "",
+    "## Page-Specific Rules",
+    "",
+])
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _override_rules(page_overrides) -> str:
+    """Everything below the header of a page override file."""
+    page_overrides = dict(page_overrides)
+    lines = []
+
+    for title, key, fallback in (("Layout", "layout", "use Master layout"),
+                                 ("Spacing", "spacing", "use Master spacing"),
+                                 ("Typography", "typography", "use Master typography"),
+                                 ("Color", "colors", "use Master colors")):
+        lines += [f"### {title} Overrides", ""]
+        overrides = page_overrides.get(key, ())
+        if overrides:
+            lines += [f"- **{name}:** {value}" for name, value in overrides]
+        else:
+            lines.append(f"- No overrides — {fallback}")
+        lines.append("")
+
+    lines += ["### Component Overrides", ""]
+    components = page_overrides.get("components", ())
+    lines += [f"- {comp}" for comp in components] or ["- No overrides — use Master component specs"]
     lines.append("")
-    lines.append("Before delivering any UI code, verify:")
+
+    lines += ["---", "", "## Page-Specific Components", ""]
+    unique_components = page_overrides.get("unique_components", ())
+    lines += [f"- {comp}" for comp in unique_components] or ["- No unique components for this page"]
     lines.append("")
-    lines.append("- [ ] No emojis used as icons (use SVG instead)")
-    lines.append("- [ ] All icons from consistent icon set (Heroicons/Lucide)")
-    lines.append("- [ ] `cursor-pointer` on all clickable elements")
-    lines.append("- [ ] Hover states with smooth transitions (150-300ms)")
-    lines.append("- [ ] Light mode: text contrast 4.5:1 minimum")
-    lines.append("- [ ] Focus states visible for keyboard navigation")
-    lines.append("- [ ] `prefers-reduced-motion` respected")
-    lines.append("- [ ] Responsive: 375px, 768px, 1024px, 1440px")
-    lines.append("- [ ] No content hidden behind fixed navbars")
-    lines.append("- [ ] No horizontal scroll on mobile")
+
+    lines += ["---", "", "## Recommendations", ""]
+    lines += [f"- {rec}" for rec in page_overrides.get("recommendations", ())]
     lines.append("")
-    
+
     return "\n".join(lines)
 
 
@@ -807,108 +1140,71 @@ def format_page_override_md(design_system: dict, page_name: str, page_query: str
     project = design_system.get("project_name", "PROJECT")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     page_title = page_name.replace("-", " ").replace("_", " ").title()
-    
+
     # Detect page type and generate intelligent overrides
     page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
-    
-    lines = []
-    
-    lines.append(f"# {page_title} Page Overrides")
-    lines.append("")
-    lines.append(f"> **PROJECT:** {project}")
-    lines.append(f"> **Generated:** {timestamp}")
-    lines.append(f"> **Page Type:** {page_overrides.get('page_type', 'General')}")
-    lines.append("")
-    lines.append("> ⚠️ **IMPORTANT:** Rules in this file **override** the Master file (`design-system/MASTER.md`).")
-    lines.append("> Only deviations from the Master are documented here. For all other rules, refer to the Master.")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    
-    # Page-specific rules with actual content
-    lines.append("## Page-Specific Rules")
-    lines.append("")
-    
-    # Layout Overrides
-    lines.append("### Layout Overrides")
-    lines.append("")
-    layout = page_overrides.get("layout", {})
-    if layout:
-        for key, value in layout.items():
-            lines.append(f"- **{key}:** {value}")
-    else:
-        lines.append("- No overrides — use Master layout")
-    lines.append("")
-    
-    # Spacing Overrides
-    lines.append("### Spacing Overrides")
-    lines.append("")
-    spacing = page_overrides.get("spacing", {})
-    if spacing:
-        for key, value in spacing.items():
-            lines.append(f"- **{key}:** {value}")
-    else:
-        lines.append("- No overrides — use Master spacing")
-    lines.append("")
-    
-    # Typography Overrides
-    lines.append("### Typography Overrides")
-    lines.append("")
-    typography = page_overrides.get("typography", {})
-    if typography:
-        for key, value in typography.items():
-            lines.append(f"- **{key}:** {value}")
-    else:
-        lines.append("- No overrides — use Master typography")
-    lines.append("")
-    
-    # Color Overrides
-    lines.append("### Color Overrides")
-    lines.append("")
-    colors = page_overrides.get("colors", {})
-    if colors:
-        for key, value in colors.items():
-            lines.append(f"- **{key}:** {value}")
-    else:
-        lines.append("- No overrides — use Master colors")
-    lines.append("")
-    
-    # Component Overrides
-    lines.append("### Component Overrides")
-    lines.append("")
-    components = page_overrides.get("components", [])
-    if components:
-        for comp in components:
-            lines.append(f"- {comp}")
-    else:
-        lines.append("- No overrides — use Master component specs")
-    lines.append("")
-    
-    # Page-Specific Components
-    lines.append("---")
-    lines.append("")
-    lines.append("## Page-Specific Components")
-    lines.append("")
-    unique_components = page_overrides.get("unique_components", [])
-    if unique_components:
-        for comp in unique_components:
-            lines.append(f"- {comp}")
-    else:
-        lines.append("- No unique components for this page")
-    lines.append("")
-    
-    # Recommendations
-    lines.append("---")
-    lines.append("")
-    lines.append("## Recommendations")
-    lines.append("")
-    recommendations = page_overrides.get("recommendations", [])
-    if recommendations:
-        for rec in recommendations:
-            lines.append(f"- {rec}")
-    lines.append("")
-    
-    return "\n".join(lines)
+
+    return "\n".join([
+        f"# {page_title} Page Overrides",
+        "",
+        f"> **PROJECT:** {project}",
+        f"> **Generated:** {timestamp}",
+        f"> **Page Type:** {page_overrides.get('page_type', 'General')}",
+        "",
+        _OVERRIDE_NOTICE,
+        _render(_override_rules, _freeze(page_overrides)),
+    ])
+
+
+# Override searches depend only on the page type and the query, so pages of
+# one type (dashboard, admin, analytics, ...) share one search set per project
+OVERRIDE_CACHE_SIZE = 256
+_OVERRIDE_DOMAINS = {"style": 1, "ux": 3, "landing": 1}
+_OVERRIDE_SEARCHES = {}
+
+PAGE_TYPE_PATTERNS = [
+    (["dashboard", "admin", "analytics", "data", "metrics", "stats", "monitor", "overview"], "Dashboard / Data View"),
+    (["checkout", "payment", "cart", "purchase", "order", "billing"], "Checkout / Payment"),
+    (["settings", "profile", "account", "preferences", "config"], "Settings / Profile"),
+    (["landing", "marketing", "homepage", "hero", "home", "promo"], "Landing / Marketing"),
+    (["login", "signin", "signup", "register", "auth", "password"], "Authentication"),
+    (["pricing", "plans", "subscription", "tiers", "packages"], "Pricing / Plans"),
+    (["blog", "article", "post", "news", "content", "story"], "Blog / Article"),
+    (["product", "item", "detail", "pdp", "shop", "store"], "Product Detail"),
+    (["search", "results", "browse", "filter", "catalog", "list"], "Search Results"),
+    (["empty", "404", "error", "not found", "zero"], "Empty State"),
+]
+
+
+def _match_page_type(text: str):
+    """(page type, canonical keyword) of the first pattern found in text, else (None, None)."""
+    for keywords, page_type in PAGE_TYPE_PATTERNS:
+        if any(kw in text for kw in keywords):
+            return page_type, keywords[0]
+    return None, None
+
+
+def _override_data_version() -> tuple:
+    """Changes whenever an index the override searches read is rebuilt."""
+    version = [INDEX_VERSION]
+    for domain in _OVERRIDE_DOMAINS:
+        config = CSV_CONFIG[domain]
+        filepath = DATA_DIR / config["file"]
+        version.append(load_index(filepath, config["search_cols"])["sha256"] if filepath.exists() else None)
+    return tuple(version)
+
+
+def _override_searches(key: tuple, context: str) -> tuple:
+    """(style, ux, landing) results for an override context, memoized per key and data version."""
+    cache_key = key + (_override_data_version(),)
+    results = _OVERRIDE_SEARCHES.get(cache_key)
+    if results is None:
+        results = tuple(search(context, domain, max_results=n).get("results", [])
+                        for domain, n in _OVERRIDE_DOMAINS.items())
+        if len(_OVERRIDE_SEARCHES) >= OVERRIDE_CACHE_SIZE:
+            _OVERRIDE_SEARCHES.clear()
+        _OVERRIDE_SEARCHES[cache_key] = results
+    return results
 
 
 def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict) -> dict:
@@ -916,26 +1212,26 @@ def _generate_intelligent_overrides(page_name: str, page_query: str, design_syst
     Generate intelligent overrides based on page type using layered search.
     
     Uses the existing search infrastructure to find relevant style, UX, and layout
-    data instead of hardcoded page types.
+    data instead of hardcoded page types. Pages whose name names a known page
+    type search with that type's canonical keyword, so they share cached results.
     """
-    from core import search
-    
     page_lower = page_name.lower()
     query_lower = (page_query or "").lower()
-    combined_context = f"{page_lower} {query_lower}"
-    
+
+    page_type, keyword = _match_page_type(page_lower)
+    if page_type:
+        combined_context = f"{keyword} {query_lower}"
+        key = (page_type, tuple(tokenize(query_lower)))
+    else:
+        combined_context = f"{page_lower} {query_lower}"
+        key = (None, tuple(tokenize(combined_context)))
+
     # Search across multiple domains for page-specific guidance
-    style_search = search(combined_context, "style", max_results=1)
-    ux_search = search(combined_context, "ux", max_results=3)
-    landing_search = search(combined_context, "landing", max_results=1)
-    
-    # Extract results from search response
-    style_results = style_search.get("results", [])
-    ux_results = ux_search.get("results", [])
-    landing_results = landing_search.get("results", [])
-    
-    # Detect page type from search results or context
-    page_type = _detect_page_type(combined_context, style_results)
+    style_results, ux_results, landing_results = _override_searches(key, combined_context)
+
+    # Unrecognised page name: detect page type from the query or search results
+    if page_type is None:
+        page_type = _detect_page_type(combined_context, style_results)
     
     # Build overrides from search results
     layout = {}
@@ -1022,22 +1318,9 @@ def _detect_page_type(context: str, style_results: list) -> str:
     context_lower = context.lower()
     
     # Check for common page type patterns
-    page_patterns = [
-        (["dashboard", "admin", "analytics", "data", "metrics", "stats", "monitor", "overview"], "Dashboard / Data View"),
-        (["checkout", "payment", "cart", "purchase", "order", "billing"], "Checkout / Payment"),
-        (["settings", "profile", "account", "preferences", "config"], "Settings / Profile"),
-        (["landing", "marketing", "homepage", "hero", "home", "promo"], "Landing / Marketing"),
-        (["login", "signin", "signup", "register", "auth", "password"], "Authentication"),
-        (["pricing", "plans", "subscription", "tiers", "packages"], "Pricing / Plans"),
-        (["blog", "article", "post", "news", "content", "story"], "Blog / Article"),
-        (["product", "item", "detail", "pdp", "shop", "store"], "Product Detail"),
-        (["search", "results", "browse", "filter", "catalog", "list"], "Search Results"),
-        (["empty", "404", "error", "not found", "zero"], "Empty State"),
-    ]
-    
-    for keywords, page_type in page_patterns:
-        if any(kw in context_lower for kw in keywords):
-            return page_type
+    page_type, _ = _match_page_type(context_lower)
+    if page_type:
+        return page_type
     
     # Fallback: try to infer from style results
     if style_results:
@@ -5,18 +5,40 @@ UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
 Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
        python search.py "<query>" --design-system [-p "Project Name"]
        python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
+       python search.py --design-system --batch queries.jsonl [--workers 4] [--persist]
 
 Domains: style, prompt, color, chart, landing, product, ux, typography
+         all (every domain and stack in one pass, per-domain results + global ranking)
 Stacks: html-tailwind, react, nextjs
 
 Persistence (Master + Overrides pattern):
   --persist    Save design system to design-system/MASTER.md
   --page       Also create a page-specific override file in design-system/pages/
+               (repeat for several pages; unchanged files are not rewritten)
+
+Batch design systems:
+  --batch      JSON Lines file, one job per line: {"query": "...", "project_name": "...", "page": "..."}
+               (or just a JSON string query). Results stream out as each one completes.
+
+Profiling:
+  --profile    Add per-phase timings (index load, tokenize, score, select,
+               materialize) and posting-list statistics to the output
+
+Indexing:
+  --build-index  Prebuild the on-disk BM25 index for every domain and stack
+
+Daemon:
+  When daemon.py is running, queries are answered by it from warm indexes.
+  Without a daemon (or with --no-daemon) the search runs in-process.
 """
 
 import argparse
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system, persist_design_system
+import os
+from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, FEDERATED_DOMAIN
+
+# Startup dominates short queries, so each branch below imports only what it
+# needs: a domain search never loads design_system, and --no-daemon never
+# loads the socket client.
 
 
 def format_output(result):
@@ -33,8 +55,26 @@ def format_output(result):
         output.append(f"**Domain:** {result['domain']} | **Query:** {result['query']}")
     output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results\n")
 
-    for i, row in enumerate(result['results'], 1):
-        output.append(f"### Result {i}")
+    _format_rows(output, result['results'], "###")
+
+    if result.get("profile"):
+        output.append("### Profile")
+        for key, value in result["profile"].items():
+            output.append(f"- **{key}:** {value}")
+        output.append("")
+
+    # Federated search: per-domain top results after the global ranking
+    for name, section in result.get("domains", {}).items():
+        output.append(f"### {name} ({section['file']})")
+        _format_rows(output, section['results'], "####")
+
+    return "\n".join(output)
+
+
+def _format_rows(output, rows, heading):
+    """Append numbered result rows to output, truncating long values"""
+    for i, row in enumerate(rows, 1):
+        output.append(f"{heading} Result {i}")
         for key, value in row.items():
             value_str = str(value)
             if len(value_str) > 300:
@@ -42,37 +82,76 @@ def format_output(result):
             output.append(f"- **{key}:** {value_str}")
         output.append("")
 
-    return "\n".join(output)
-
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
-    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
+    parser.add_argument("query", nargs="?", help="Search query")
+    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()) + [FEDERATED_DOMAIN], help="Search domain (all: every domain and stack)")
     parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
     parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--profile", action="store_true", help="Include per-phase timings and posting-list statistics")
     # Design system generation
     parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
     parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format for design system")
     # Persistence (Master + Overrides pattern)
     parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
-    parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
+    parser.add_argument("--page", type=str, action="append", default=None, help="Create page-specific override file in design-system/pages/ (repeatable)")
     parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    # Batch design systems
+    parser.add_argument("--batch", type=str, default=None, help="With --design-system: JSON Lines file of jobs to generate in one run")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --batch (default: one per CPU)")
+    # Index maintenance
+    parser.add_argument("--build-index", action="store_true", help="Prebuild the on-disk search index for all domains and stacks")
+    parser.add_argument("--no-daemon", action="store_true", help="Always search in-process, even if the search daemon is running")
 
     args = parser.parse_args()
 
+    def via_daemon(op, **kwargs):
+        """Ask the running daemon; None means no daemon, so handle it in-process"""
+        if args.no_daemon:
+            return None
+        import daemon
+        return daemon.request(op, **kwargs)
+
+    if args.build_index:
+        from core import build_indexes
+        built = build_indexes()
+        print(f"Indexed {len(built)} CSV files")
+    elif args.design_system and args.batch:
+        import json
+        from design_system import generate_design_systems
+        with open(args.batch, 'r', encoding='utf-8') as f:
+            jobs = [json.loads(line) for line in f if line.strip()]
+        output_dir = args.output_dir or os.getcwd()
+        for position, job, output in generate_design_systems(jobs, args.format, args.persist, output_dir, args.workers):
+            print(f"# [{position + 1}/{len(jobs)}] {job['query']}")
+            print(output, flush=True)
+    elif args.query is None:
+        parser.error("the following arguments are required: query")
     # Design system takes priority
-    if args.design_system:
-        result = generate_design_system(
-            args.query, 
-            args.project_name, 
-            args.format,
+    elif args.design_system:
+        # The daemon has its own working directory, so always send an absolute output path
+        result = via_daemon(
+            "generate_design_system",
+            query=args.query,
+            project_name=args.project_name,
+            output_format=args.format,
             persist=args.persist,
-            page=args.page,
-            output_dir=args.output_dir
+            pages=args.page,
+            output_dir=os.path.abspath(args.output_dir or os.getcwd())
         )
+        if result is None:
+            from design_system import generate_design_system
+            result = generate_design_system(
+                args.query, 
+                args.project_name, 
+                args.format,
+                persist=args.persist,
+                output_dir=args.output_dir,
+                pages=args.page
+            )
         print(result)
         
         # Print persistence confirmation
@@ -81,8 +160,8 @@ if __name__ == "__main__":
             print("\n" + "=" * 60)
             print(f"✅ Design system persisted to design-system/{project_slug}/")
             print(f"   📄 design-system/{project_slug}/MASTER.md (Global Source of Truth)")
-            if args.page:
-                page_filename = args.page.lower().replace(' ', '-')
+            for page in args.page or []:
+                page_filename = page.lower().replace(' ', '-')
                 print(f"   📄 design-system/{project_slug}/pages/{page_filename}.md (Page Overrides)")
             print("")
             print(f"📖 Usage: When building a page, check design-system/{project_slug}/pages/[page].md first.")
@@ -90,7 +169,10 @@ if __name__ == "__main__":
             print("=" * 60)
     # Stack search
     elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
+        result = via_daemon("search_stack", query=args.query, stack=args.stack, max_results=args.max_results, profile=args.profile)
+        if result is None:
+            from core import search_stack
+            result = search_stack(args.query, args.stack, args.max_results, args.profile)
         if args.json:
             import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -98,7 +180,10 @@ if __name__ == "__main__":
             print(format_output(result))
     # Domain search
     else:
-        result = search(args.query, args.domain, args.max_results)
+        result = via_daemon("search", query=args.query, domain=args.domain, max_results=args.max_results, profile=args.profile)
+        if result is None:
+            from core import search
+            result = search(args.query, args.domain, args.max_results, args.profile)
         if args.json:
             import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorized BM25 - NumPy/SciPy backend for scoring query batches offline.
+
+The corpus is held as a sparse term x document matrix whose entries are the
+full BM25 term weights (IDF times the saturated, length-normalised term
+frequency). A batch of queries becomes a sparse query x term matrix with one
+entry per query token, so a single sparse product scores every query against
+every document. Contributions are summed in query-token order, which keeps
+scores bit-identical to BM25.top_k().
+
+Requires numpy and scipy (pip install numpy scipy).
+
+Usage:
+    from vectorized import batch_search
+    results = batch_search(["SaaS dashboard", "healthcare app"], "product")
+
+    python vectorized.py queries.txt --domain style -n 3
+"""
+
+from core import CSV_CONFIG, STACK_CONFIG, _STACK_COLS, DATA_DIR, MAX_RESULTS, FEDERATED_DOMAIN, \
+    detect_domain, load_index, search_all, _collect_results
+
+try:
+    import numpy as np
+    from scipy import sparse
+    VECTORIZED_AVAILABLE = True
+except ImportError:
+    VECTORIZED_AVAILABLE = False
+
+
+# ============ VECTORIZED BM25 ============
+BLOCK_CELLS = 1 << 22
+
+
+class VectorizedBM25:
+    """Sparse-matrix view of a fitted core.BM25 for batch scoring"""
+
+    def __init__(self, bm25):
+        if not VECTORIZED_AVAILABLE:
+            raise ImportError("VectorizedBM25 requires numpy and scipy: pip install numpy scipy")
+
+        self.bm25 = bm25
+        n_terms = len(bm25.doc_freqs)
+
+        # Term x document CSR: row t holds the BM25 weight of term t in every
+        # document that contains it, in the same float order as BM25._accumulate.
+        # BM25 already packs its postings CSR-style, so they map across directly.
+        indptr = np.asarray(bm25.post_offsets, dtype=np.int64)
+        doc_ids = np.asarray(bm25.post_docs, dtype=np.int64)
+        tfs = np.asarray(bm25.post_tfs, dtype=np.float64)
+        idfs = np.repeat(np.asarray(bm25.idf, dtype=np.float64), np.diff(indptr))
+        norms = np.asarray(bm25.doc_norms, dtype=np.float64)
+        weights = idfs * (tfs * (bm25.k1 + 1)) / (tfs + norms[doc_ids])
+
+        self.weights = sparse.csr_matrix((weights, doc_ids, indptr), shape=(n_terms, bm25.N))
+
+    def _query_matrix(self, queries):
+        """One row per query, one entry per encoded query term (duplicates kept, in order)
+
+        Entries carry the term weights from BM25.encode: 1.0 for exact
+        tokens, less for fuzzy expansions of unknown ones.
+        """
+        indptr = [0]
+        term_ids = []
+        weights = []
+        for query in queries:
+            for term_id, weight in self.bm25.encode(query):
+                term_ids.append(term_id)
+                weights.append(weight)
+            indptr.append(len(term_ids))
+        data = np.asarray(weights, dtype=np.float64)
+        return sparse.csr_matrix((data, term_ids, indptr), shape=(len(queries), self.weights.shape[0]))
+
+    def top_k_batch(self, queries, k):
+        """Score all queries in one sparse product, return top-k (doc index, score) lists"""
+        queries = list(queries)
+        if not queries or self.bm25.N == 0 or k <= 0:
+            return [[] for _ in queries]
+
+        ranked = []
+        # Densify in blocks of queries so the score matrix stays around BLOCK_CELLS floats
+        block = max(1, BLOCK_CELLS // self.bm25.N)
+        for start in range(0, len(queries), block):
+            scores = (self._query_matrix(queries[start:start + block]) @ self.weights).toarray()
+            # Stable sort on negated scores: best first, lower document index first on ties
+            order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+            top = np.take_along_axis(scores, order, axis=1)
+            for docs, values in zip(order.tolist(), top.tolist()):
+                ranked.append([(idx, score) for idx, score in zip(docs, values) if score > 0])
+        return ranked
+
+
+# ============ BATCH SEARCH ============
+_MATRICES = {}
+
+
+def _vectorized_index(filepath, search_cols):
+    """Return (rows, VectorizedBM25) for a CSV, rebuilt whenever its BM25 index is"""
+    index = load_index(filepath, search_cols)
+    key = (str(filepath), tuple(search_cols))
+    cached = _MATRICES.get(key)
+    if cached is None or cached.bm25 is not index["bm25"]:
+        cached = VectorizedBM25(index["bm25"])
+        _MATRICES[key] = cached
+    return index["rows"], cached
+
+
+def _batch_search_csv(filepath, search_cols, output_cols, queries, max_results):
+    """Batch counterpart of core._search_csv, returns one result list per query"""
+    if not filepath.exists():
+        return [[] for _ in queries]
+    rows, matrix = _vectorized_index(filepath, search_cols)
+    return [_collect_results(rows, ranked, output_cols) for ranked in matrix.top_k_batch(queries, max_results)]
+
+
+def batch_search(queries, domain=None, max_results=MAX_RESULTS):
+    """Vectorized core.search over many queries; domain is auto-detected per query if omitted"""
+    queries = list(queries)
+    domains = [domain or detect_domain(q) for q in queries]
+    output = [None] * len(queries)
+
+    for name in dict.fromkeys(domains):
+        positions = [i for i, d in enumerate(domains) if d == name]
+        if name == FEDERATED_DOMAIN:
+            # Already a single pass per query over the federated index
+            for i in positions:
+                output[i] = search_all(queries[i], max_results)
+            continue
+
+        config = CSV_CONFIG.get(name, CSV_CONFIG["style"])
+        filepath = DATA_DIR / config["file"]
+
+        if not filepath.exists():
+            for i in positions:
+                output[i] = {"error": f"File not found: {filepath}", "domain": name}
+            continue
+
+        batch = [queries[i] for i in positions]
+        results = _batch_search_csv(filepath, config["search_cols"], config["output_cols"], batch, max_results)
+        for i, res in zip(positions, results):
+            output[i] = {
+                "domain": name,
+                "query": queries[i],
+                "file": config["file"],
+                "count": len(res),
+                "results": res
+            }
+
+    return output
+
+
+def batch_search_stack(queries, stack, max_results=MAX_RESULTS):
+    """Vectorized core.search_stack over many queries"""
+    queries = list(queries)
+    if stack not in STACK_CONFIG:
+        return [{"error": f"Unknown stack: {stack}. Available: {', '.join(STACK_CONFIG)}"} for _ in queries]
+
+    filepath = DATA_DIR / STACK_CONFIG[stack]["file"]
+    if not filepath.exists():
+        return [{"error": f"Stack file not found: {filepath}", "stack": stack} for _ in queries]
+
+    results = _batch_search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], queries, max_results)
+    return [{
+        "domain": "stack",
+        "stack": stack,
+        "query": query,
+        "file": STACK_CONFIG[stack]["file"],
+        "count": len(res),
+        "results": res
+    } for query, res in zip(queries, results)]
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Vectorized BM25 batch search")
+    parser.add_argument("queries", help="Text file with one query per line")
+    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()) + [FEDERATED_DOMAIN], help="Search domain (auto-detected per query if omitted)")
+    parser.add_argument("--stack", "-s", choices=list(STACK_CONFIG.keys()), help="Stack-specific search")
+    parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results per query (default: 3)")
+
+    args = parser.parse_args()
+
+    with open(args.queries, 'r', encoding='utf-8') as f:
+        query_list = [line.strip() for line in f if line.strip()]
+
+    if args.stack:
+        output = batch_search_stack(query_list, args.stack, args.max_results)
+    else:
+        output = batch_search(query_list, args.domain, args.max_results)
+
+    # JSON Lines: one result object per query, in input order
+    for result in output:
+        print(json.dumps(result, ensure_ascii=False))
@@ -1,37 +1,358 @@
+import asyncio
 import json
 import os
 import glob
 import time
+import hashlib
+import re
+import sqlite3
+import threading
 from deep_translator import GoogleTranslator
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from deep_translator.exceptions import RequestError, TooManyRequests
+from concurrent.futures import ThreadPoolExecutor
 
 # Configuration
 SOURCE_DIR = r"backend/src/data/questions"
 TARGET_DIR = r"backend/src/data/questions/hungarian"
 FINAL_FILE = r"backend/src/data/questions/all_questions_hungarian.json"
+MEMORY_FILE = r"backend/src/data/questions/hungarian/translation_memory.sqlite"
+JOURNAL_FILE = r"backend/src/data/questions/hungarian/translation_journal.jsonl"
+ENGINE = "google"
+# Segments are packed into one request, joined by a delimiter the translator
+# leaves alone; GoogleTranslator rejects payloads over 5000 characters
+MAX_BATCH_CHARS = 4500
+SEGMENT_DELIMITER = "\n@@@\n"
+DELIMITER_PATTERN = re.compile(r"\s*@@@\s*")
+# One request window shared by every file (see AdaptiveLimiter). Rate and
+# concurrency start here, grow while responses are fast and are cut on 429s.
+REQUESTS_PER_SECOND = 5.0
+MIN_REQUESTS_PER_SECOND = 0.2
+MAX_REQUESTS_PER_SECOND = 20.0
+BURST = 5
+INITIAL_CONCURRENCY = 4
+MAX_CONCURRENCY = 16
+TARGET_LATENCY = 3.0  # seconds; slower responses shrink the window
+MAX_THROTTLE_RETRIES = 8
+# Segments that failed with a transient error are re-sent in later rounds
+MAX_RETRY_ROUNDS = 3
+RETRY_BACKOFF = 2.0  # seconds before the first retry round, doubled each round
 
 # Ensure target directory exists
 os.makedirs(TARGET_DIR, exist_ok=True)
 
+class TranslationMemory:
+    """Persistent translation store keyed by a hash of (source text, target language, engine)."""
+
+    def __init__(self, path):
+        # One connection shared by the worker threads, serialized by the lock
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, source TEXT, target_lang TEXT, engine TEXT, translation TEXT)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(text, target_lang, engine=ENGINE):
+        return hashlib.sha256("\x1f".join((engine, target_lang, text)).encode("utf-8")).hexdigest()
+
+    def get(self, text, target_lang, engine=ENGINE):
+        """Stored translation, or None if this string was never translated."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT translation FROM translations WHERE key = ?", (self.key(text, target_lang, engine),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, text, target_lang, translation, engine=ENGINE):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+                (self.key(text, target_lang, engine), text, target_lang, engine, translation),
+            )
+            self.conn.commit()
+
+    def put_many(self, pairs, target_lang, engine=ENGINE):
+        """Stores (source, translation) pairs in a single transaction."""
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+                [(self.key(text, target_lang, engine), text, target_lang, engine, translation)
+                 for text, translation in pairs],
+            )
+            self.conn.commit()
+
+_memory = None
+_memory_lock = threading.Lock()
+
+def get_memory():
+    """Opens the translation memory on first use."""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = TranslationMemory(MEMORY_FILE)
+        return _memory
+
+class CheckpointJournal:
+    """Append-only JSONL record of failed segments, flushed as results arrive.
+
+    Successes are checkpointed by the translation memory, which commits after
+    every batch; the journal holds what the memory cannot: one line per
+    failure, {"key", "source", "error", "transient"}. On restart replay()
+    tells which segments an earlier run could not translate, so transient
+    failures are retried and permanent ones are not sent again. A failure
+    is superseded once the segment is in the translation memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def replay(self, target_lang, engine=ENGINE):
+        """({source: error} transient, {source: error} permanent) recorded for this target language and engine."""
+        transient, permanent = {}, {}
+        if not os.path.exists(self.path):
+            return transient, permanent
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from a crash
+                source = entry.get("source")
+                if not isinstance(source, str) or entry.get("key") != TranslationMemory.key(source, target_lang, engine):
+                    continue
+                # The later line wins
+                transient.pop(source, None)
+                permanent.pop(source, None)
+                (transient if entry.get("transient") else permanent)[source] = entry.get("error", "")
+        return transient, permanent
+
+    def record(self, errors, target_lang, engine=ENGINE):
+        """Appends (source, exception) pairs and syncs them to disk."""
+        if not errors:
+            return
+        entries = [{"key": TranslationMemory.key(text, target_lang, engine), "source": text,
+                    "error": f"{type(error).__name__}: {error}", "transient": is_transient(error)}
+                   for text, error in errors]
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        """Drops the journal once a run has finished with nothing left to retry."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def is_transient(error):
+    """Errors worth another attempt later: throttling, network and HTTP request failures."""
+    return isinstance(error, (TooManyRequests, RequestError, OSError))
+
+_clients = threading.local()
+
+def get_translator(target_lang):
+    """One GoogleTranslator per worker thread and target language, reused across requests."""
+    translators = getattr(_clients, "translators", None)
+    if translators is None:
+        translators = _clients.translators = {}
+    if target_lang not in translators:
+        translators[target_lang] = GoogleTranslator(source='auto', target=target_lang)
+    return translators[target_lang]
+
 def translate_text(text, target_lang='hu'):
-    """Translates text to Hungarian using Google Translate."""
+    """Translates text to Hungarian using Google Translate, consulting the translation memory first."""
     if not text or not isinstance(text, str):
         return text
+    memory = get_memory()
+    cached = memory.get(text, target_lang)
+    if cached is not None:
+        return cached
     try:
-        # Use deep_translator
-        translator = GoogleTranslator(source='auto', target=target_lang)
-        return translator.translate(text)
+        translated = get_translator(target_lang).translate(text)
     except Exception as e:
         print(f"Error translating text: {text[:30]}... Error: {e}")
         return text
+    # Failures are not stored, so the next run asks again
+    if translated is not None:
+        memory.put(text, target_lang, translated)
+    return translated
+
+def pack_batches(texts, max_chars=MAX_BATCH_CHARS):
+    """Groups texts into delimiter-joined requests of at most max_chars characters.
+
+    Texts that contain the delimiter (or are too long to share a request) go alone.
+    """
+    batch, size = [], 0
+    for text in texts:
+        cost = len(text) + len(SEGMENT_DELIMITER)
+        if DELIMITER_PATTERN.search(text) or cost > max_chars:
+            yield [text]
+            continue
+        if batch and size + cost > max_chars:
+            yield batch
+            batch, size = [], 0
+        batch.append(text)
+        size += cost
+    if batch:
+        yield batch
+
+class AdaptiveLimiter:
+    """Global request window: a token bucket for the rate plus an AIMD concurrency limit.
+
+    Every success adds 1/limit to the concurrency limit and 1/rate to the
+    rate, i.e. about one more slot per window and one more request per second
+    per second. A 429 halves both, a response slower than TARGET_LATENCY halves
+    the concurrency; responses started before the last cut do not cut again.
+    """
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, concurrency=INITIAL_CONCURRENCY):
+        self.rate = rate
+        self.limit = float(concurrency)
+        self.tokens = 1.0
+        self.refilled = time.monotonic()
+        self.decreased = 0.0
+        self.in_flight = 0
+        self.changed = asyncio.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY)
+        self.stats = {"requests": 0, "throttled": 0, "peak_in_flight": 0}
 
-def process_question(q):
-    """Deep copies and translates a single question object."""
+    async def _take_token(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(BURST, self.tokens + (now - self.refilled) * self.rate)
+            self.refilled = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    async def _release(self, started, throttled):
+        latency = time.monotonic() - started
+        async with self.changed:
+            self.in_flight -= 1
+            if throttled or latency > TARGET_LATENCY:
+                if started >= self.decreased:
+                    self.limit = max(1.0, self.limit / 2)
+                    if throttled:
+                        self.rate = max(MIN_REQUESTS_PER_SECOND, self.rate / 2)
+                    self.decreased = time.monotonic()
+            else:
+                self.limit = min(MAX_CONCURRENCY, self.limit + 1 / self.limit)
+                self.rate = min(MAX_REQUESTS_PER_SECOND, self.rate + 1 / self.rate)
+            self.changed.notify_all()
+
+    async def call(self, func, *args):
+        """Runs a blocking request in the worker pool once the window allows it; retries 429s."""
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            async with self.changed:
+                await self.changed.wait_for(lambda: self.in_flight < int(self.limit))
+                self.in_flight += 1
+                self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.in_flight)
+            await self._take_token()
+            started = time.monotonic()
+            self.stats["requests"] += 1
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+            except TooManyRequests:
+                self.stats["throttled"] += 1
+                await self._release(started, throttled=True)
+                if attempt == MAX_THROTTLE_RETRIES:
+                    raise
+                continue
+            except BaseException:
+                await self._release(started, throttled=False)
+                raise
+            await self._release(started, throttled=False)
+            return result
+
+async def translate_batch(texts, limiter, target_lang='hu'):
+    """Translates texts in one request; returns one translation or exception per text, in order."""
+    def send(payload):
+        return get_translator(target_lang).translate(payload)
+
+    if len(texts) == 1:
+        try:
+            result = await limiter.call(send, texts[0])
+        except Exception as e:
+            # Permanent failures are listed once by translate_segments()
+            if is_transient(e):
+                print(f"Error translating text: {texts[0][:30]}..., will retry. Error: {e}")
+            return [e]
+        return [result if isinstance(result, str) else ValueError("empty translation")]
+    try:
+        parts = DELIMITER_PATTERN.split((await limiter.call(send, SEGMENT_DELIMITER.join(texts))).strip())
+    except Exception as e:
+        if is_transient(e):
+            # Splitting would not help; the whole batch goes back to the retry queue
+            print(f"Error translating batch of {len(texts)} segments, will retry. Error: {e}")
+            return [e] * len(texts)
+        print(f"Error translating batch of {len(texts)} segments, splitting it. Error: {e}")
+        parts = None
+    if parts is not None and len(parts) == len(texts):
+        return parts
+    # The delimiter did not survive (or the request failed): halve until the pieces line up
+    middle = len(texts) // 2
+    first, second = await asyncio.gather(translate_batch(texts[:middle], limiter, target_lang),
+                                         translate_batch(texts[middle:], limiter, target_lang))
+    return first + second
+
+async def translate_batches(batches, journal, target_lang='hu'):
+    """Sends every batch through one AdaptiveLimiter, re-queueing transient failures.
+
+    Returns ({source: translation}, {source: error} still failing transiently,
+    {source: error} failed permanently, limiter). As each batch completes,
+    successes are stored in the translation memory and failures journaled.
+    """
+    limiter = AdaptiveLimiter()
+    memory = get_memory()
+    translations, failed, permanent = {}, {}, {}
+
+    async def run(batch):
+        results = await translate_batch(batch, limiter, target_lang)
+        done = [(t, r) for t, r in zip(batch, results) if isinstance(r, str)]
+        errors = [(t, r) for t, r in zip(batch, results) if not isinstance(r, str)]
+        memory.put_many(done, target_lang)
+        journal.record(errors, target_lang)
+        translations.update(done)
+        retry = []
+        for text, error in errors:
+            if is_transient(error):
+                failed[text] = str(error)
+                retry.append(text)
+            else:
+                failed.pop(text, None)  # a transient failure in an earlier round no longer applies
+                permanent[text] = f"{type(error).__name__}: {error}"
+        return retry
+
+    try:
+        queue = batches
+        for attempt in range(MAX_RETRY_ROUNDS + 1):
+            retry = [t for texts in await asyncio.gather(*(run(batch) for batch in queue)) for t in texts]
+            for text in translations:
+                failed.pop(text, None)
+            if not retry or attempt == MAX_RETRY_ROUNDS:
+                break
+            delay = RETRY_BACKOFF * 2 ** attempt
+            print(f"Retrying {len(retry)} segments after transient errors in {delay:.0f}s.")
+            await asyncio.sleep(delay)
+            queue = list(pack_batches(retry))
+        return translations, failed, permanent, limiter
+    finally:
+        limiter.executor.shutdown()
+
+def process_question(q, translate=translate_text):
+    """Deep copies and translates a single question object.
+
+    `translate` maps one segment to its translation; main() passes a lookup
+    into the corpus-wide table built by translate_segments().
+    """
     q_new = q.copy()
     
     # Translate core fields
-    q_new['question_text'] = translate_text(q.get('question_text', ''))
-    q_new['explanation'] = translate_text(q.get('explanation', ''))
+    q_new['question_text'] = translate(q.get('question_text', ''))
+    q_new['explanation'] = translate(q.get('explanation', ''))
     
     # Translate options (list of strings)
     if 'options' in q and isinstance(q['options'], list):
@@ -41,10 +362,10 @@ def process_question(q):
             if "->" in opt:
                 # Split, translate parts, rejoin
                 parts = opt.split("->")
-                translated_parts = [translate_text(p.strip()) for p in parts]
+                translated_parts = [translate(p.strip()) for p in parts]
                 new_options.append(" -> ".join(translated_parts))
             else:
-                new_options.append(translate_text(opt))
+                new_options.append(translate(opt))
         q_new['options'] = new_options
     
     # Translate correct answer
@@ -56,22 +377,101 @@ def process_question(q):
         for pair in pairs:
             if "->" in pair:
                 parts = pair.split("->")
-                translated_parts = [translate_text(p.strip()) for p in parts]
+                translated_parts = [translate(p.strip()) for p in parts]
                 new_pairs.append(" -> ".join(translated_parts))
             else:
-                new_pairs.append(translate_text(pair.strip()))
+                new_pairs.append(translate(pair.strip()))
         q_new['correct_answer'] = "; ".join(new_pairs)
     else:
-        q_new['correct_answer'] = translate_text(correct)
+        q_new['correct_answer'] = translate(correct)
 
     # Note: Keeping ID, type, bloom_level, topic, subtopic as is.
     # If topic/subtopic need translation, add here.
-    # q_new['topic'] = translate_text(q.get('topic', '')) 
+    # q_new['topic'] = translate(q.get('topic', '')) 
     
     return q_new
 
-def process_file(file_path):
-    """Reads, translates, and saves a single file."""
+def collect_segments(q, segments):
+    """Counts every string process_question would translate for q into segments (an ordered dict)."""
+    def record(text):
+        if text and isinstance(text, str):
+            segments[text] = segments.get(text, 0) + 1
+        return text
+    process_question(q, record)
+
+def translate_segments(segments, target_lang='hu'):
+    """Translates each unique segment once, returns ({source: translation}, {source: error}).
+
+    The translation memory answers what it can; the rest, including segments
+    that failed transiently last time, is sent in packed batches. Segments the
+    checkpoint journal records as permanently failed are not sent again.
+    Failed segments map to their source text, as in translate_text().
+    Only segments still failing with a transient error are returned as
+    failed; permanent failures (too long, invalid payload, no translation
+    found) are reported here and kept in English.
+    """
+    memory = get_memory()
+    journal = CheckpointJournal(JOURNAL_FILE)
+    previously_transient, previously_permanent = journal.replay(target_lang)
+    translations = {}
+    permanent = {}
+    missing = []
+    retrying = 0
+    for text in segments:
+        cached = memory.get(text, target_lang)
+        if cached is not None:
+            translations[text] = cached
+        elif text in previously_permanent:
+            permanent[text] = previously_permanent[text]
+        else:
+            missing.append(text)
+            retrying += text in previously_transient
+    if retrying:
+        print(f"Retrying {retrying} segments that failed in an earlier run.")
+
+    failed = {}
+    if missing:
+        batches = list(pack_batches(missing))
+        print(f"Sending {len(missing)} new segments in {len(batches)} batches.")
+        done, failed, new_permanent, limiter = asyncio.run(translate_batches(batches, journal, target_lang))
+        translations.update(done)
+        permanent.update(new_permanent)
+        print(f"{limiter.stats['requests']} requests, {limiter.stats['throttled']} throttled, "
+              f"peak {limiter.stats['peak_in_flight']} in flight, final rate {limiter.rate:.1f}/s.")
+    for text in list(failed) + list(permanent):
+        translations[text] = text
+    if permanent:
+        print(f"Keeping {len(permanent)} segments in English, they cannot be translated:")
+        for text, error in permanent.items():
+            print(f"  {text[:30]}... ({error})")
+    if failed:
+        print(f"{len(failed)} segments could not be translated; their files are not saved, re-run to retry.")
+    return translations, failed
+
+def lookup(translations):
+    """translate function for process_question backed by a translate_segments() table."""
+    def translate(text):
+        if text and isinstance(text, str):
+            return translations.get(text, text)
+        return text
+    return translate
+
+def load_pending(file_path):
+    """Questions of a batch file that still needs translating, or None if its output exists."""
+    filename = os.path.basename(file_path)
+    if os.path.exists(os.path.join(TARGET_DIR, f"hu_{filename}")):
+        return None
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def process_file(file_path, questions=None, translations=None, failed=None):
+    """Reads, translates, and saves a single file.
+
+    main() passes the already loaded questions and the corpus-wide
+    translation table; called on its own, the file is translated by itself.
+    A file with questions whose segments failed transiently is returned but
+    not saved, so the next run picks it up again.
+    """
     filename = os.path.basename(file_path)
     target_path = os.path.join(TARGET_DIR, f"hu_{filename}")
     
@@ -82,26 +482,42 @@ def process_file(file_path):
 
     print(f"Processing: {filename}...")
     
-    with open(file_path, 'r', encoding='utf-8') as f:
-        questions = json.load(f)
+    if questions is None:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            questions = json.load(f)
+
+    if translations is None:
+        segments = {}
+        for q in questions:
+            try:
+                collect_segments(q, segments)
+            except Exception:
+                pass  # reported below when the question is translated
+        translations, failed = translate_segments(segments)
+    translate = lookup(translations)
     
     translated_questions = []
-    
-    # Use threading for faster translation (I/O bound)
-    # Be careful with rate limits! Google Translate has limits.
-    # Using 5 workers to be safe-ish.
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_q = {executor.submit(process_question, q): q for q in questions}
-        for future in as_completed(future_to_q):
-            try:
-                translated_q = future.result()
-                translated_questions.append(translated_q)
-            except Exception as e:
-                print(f"Error processing question in {filename}: {e}")
-                translated_questions.append(future_to_q[future]) # Fallback to original
+    incomplete = []
+    for q in questions:
+        try:
+            translated_questions.append(process_question(q, translate))
+        except Exception as e:
+            print(f"Error processing question in {filename}: {e}")
+            translated_questions.append(q) # Fallback to original
+            continue
+        if failed:
+            question_segments = {}
+            collect_segments(q, question_segments)
+            if any(text in failed for text in question_segments):
+                incomplete.append(q.get('id', ''))
     
     # Sort by ID to maintain order
     translated_questions.sort(key=lambda x: x.get('id', ''))
+
+    if incomplete:
+        print(f"Not saving {filename}: {len(incomplete)} questions have untranslated segments "
+              f"({', '.join(map(str, incomplete[:5]))}{', ...' if len(incomplete) > 5 else ''})")
+        return translated_questions
     
     with open(target_path, 'w', encoding='utf-8') as f:
         json.dump(translated_questions, f, indent=4, ensure_ascii=False)
@@ -117,18 +533,34 @@ def main():
     all_questions = []
     
     print(f"Found {len(batch_files)} batch files to translate.")
+
+    # Pre-pass: options, answers and matching fragments repeat across the
+    # whole corpus, so every unique segment is translated exactly once
+    pending = {path: load_pending(path) for path in batch_files}
+    segments = {}
+    for questions in pending.values():
+        for q in questions or []:
+            try:
+                collect_segments(q, segments)
+            except Exception:
+                pass  # reported when process_file translates the question
+    print(f"Translating {len(segments)} unique segments ({sum(segments.values())} in total).")
+    translations, failed = translate_segments(segments)
     
     for file_path in batch_files:
-        batch_questions = process_file(file_path)
+        batch_questions = process_file(file_path, pending[file_path], translations, failed)
         all_questions.extend(batch_questions)
-        # Sleep briefly to be nice to the API
-        time.sleep(1)
 
     # Save merged file
     print(f"Merging {len(all_questions)} questions into {FINAL_FILE}...")
     with open(FINAL_FILE, 'w', encoding='utf-8') as f:
         json.dump(all_questions, f, indent=4, ensure_ascii=False)
     
+    if failed:
+        print(f"Done, but {len(failed)} segments are still in English. Re-run to retry them.")
+        return
+    # Everything is saved and in the translation memory; the checkpoint is no longer needed
+    CheckpointJournal(JOURNAL_FILE).clear()
     print("Done! Translation complete.")
 
 if __name__ == "__main__":